@@ -1,9 +1,23 @@
-import streamlit as st
-import requests
-from bs4 import BeautifulSoup
 import datetime
-import re
-from dateutil.parser import parse  # Add to requirements.txt: python-dateutil
+import os
+from urllib.parse import quote
+
+import streamlit as st
+
+from planner import daily_cost, estimate_total_cost, metrics, plan_events, prefetch, rank, sweep_dates
+from planner.cache import result_cache
+from planner.prices import sort_key
+
+# Streamlit front end; all scraping and costing lives in the planner package
+
+st.set_page_config(page_title="Epic Travel Planner", page_icon="✈️")
+
+# Prometheus /metrics endpoint for this server process (started once, on the first run that sees the setting)
+if os.environ.get("VOYAGEAI_METRICS_PORT"):
+    metrics.start_server(int(os.environ["VOYAGEAI_METRICS_PORT"]))
+# Keep popular routes warm in the result cache from a background thread (see planner.prefetch)
+if os.environ.get("VOYAGEAI_PREFETCH"):
+    prefetch.start()
 
 # Add background image and enhanced text/button fixes via CSS
 st.markdown("""
@@ -47,280 +61,42 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Modular fallback dictionaries (expand as needed)
-FALLBACK_TRANSPORTS = {
-    "chiangmai": [
-        {"mode": "Bus (direct or via Bangkok, ~10-12h)", "price": "~$20-40", "link": "https://www.bookaway.com/routes/thailand/bangkok-to-chiang-mai"},
-        {"mode": "Train + Bus (~12h total)", "price": "~$15-30", "link": "https://www.rome2rio.com/s/Bangkok/Chiang-Mai"}
-    ],
-    "kualalumpur": [
-        {"mode": "Flight (from BKK to KUL, ~2h)", "price": "~$50-100", "link": "https://www.skyscanner.net/transport/flights/bkkt/kul/"},
-        {"mode": "Bus + Flight (Pattaya to BKK ~2h, then flight ~2h)", "price": "~$10 + $50-100 (total ~$60-110)", "link": "https://www.rome2rio.com/s/Pattaya/Kuala-Lumpur"},
-        {"mode": "Train + Bus (via border, ~24h total)", "price": "~$30-60", "link": "https://www.seat61.com/Malaysia.htm"}
-    ],
-    "bangkok": [
-        {"mode": "Bus (direct, ~2h from Pattaya)", "price": "~$5-10", "link": "https://www.rome2rio.com/s/Pattaya/Bangkok"},
-        {"mode": "Minivan (~2h)", "price": "~$4-8", "link": "https://www.bookaway.com/routes/thailand/pattaya-to-bangkok"}
-    ],
-    "phuket": [
-        {"mode": "Flight (from BKK, ~1.5h)", "price": "~$30-60", "link": "https://www.skyscanner.net/transport/flights/bkkt/hkt/"},
-        {"mode": "Bus (~12h)", "price": "~$20-40", "link": "https://www.rome2rio.com/s/Bangkok/Phuket"}
-    ],
-    "singapore": [
-        {"mode": "Flight (from BKK, ~2.5h)", "price": "~$60-120", "link": "https://www.skyscanner.net/transport/flights/bkkt/sin/"},
-        {"mode": "Bus + Flight (~4h total from Pattaya)", "price": "~$10 + $60-120", "link": "https://www.rome2rio.com/s/Pattaya/Singapore"}
-    ],
-    "roma": [
-        {"mode": "Flight (BKK to FCO, ~12h with stopover)", "price": "~$400-800", "link": "https://www.skyscanner.net/transport/flights/bkkt/rome/"},
-        {"mode": "Bus + Flight (Pattaya to BKK ~2h, then flight)", "price": "~$10 + $400-800 (total ~$410-810)", "link": "https://www.rome2rio.com/s/Pattaya/Rome-Italy"},
-        {"mode": "Multi-stop (train/bus + flight, 20h+)", "price": "~$350-700", "link": "https://www.kayak.com/flights/BKK-ROM"}
-    ],
-    "tokyo": [  # Added for Tokyo
-        {"mode": "Flight (direct or with stop, ~6-8h from major hubs)", "price": "~$300-600", "link": "https://www.skyscanner.net/transport/flights/tyoa/tyo/"},
-        {"mode": "Flight with layover (e.g., via Seoul, ~10h total)", "price": "~$250-500", "link": "https://www.rome2rio.com/s/Rome-Italy/Tokyo"},
-        {"mode": "Premium flight (business class, ~7h)", "price": "~$1000+", "link": "https://www.kayak.com/flights/ROM-TYO"}
+# Markdown for each section, shared by the partial (still searching) and final views.
+# Each section always renders as one body element plus one status caption, so redraws replace in place.
+def transports_md(transports):
+    return "\n".join(f"- **{t['mode']}** for {t['price']}: [Book here]({t['link']})" for t in transports)
+
+def hotels_md(hotels):
+    return "\n".join(f"- **{h['name']}** - Rating: {h['rating']}, Price: {h['price']}: [Book here]({h['link']})" for h in hotels)
+
+def attractions_md(attractions):
+    return "\n".join(f"- {attr}" for attr in attractions)
+
+# Timing waterfall of the latest plan: one bar per fetch/parse/fallback/sort span
+def show_waterfall(trace):
+    rows = [
+        {
+            "step": f"{s['section'] or ''} · {s['provider'] or '-'} · {s['stage']}",
+            "start_ms": round(s['start_ms'], 1),
+            "end_ms": round(s['end_ms'], 1),
+            "outcome": "ok" if s['ok'] else s.get('error', "failed"),
+        }
+        for s in trace['spans']
     ]
-    # Add more cities here
-}
-
-FALLBACK_HOTELS = {
-    "chiangmai": [
-        {"name": "Akyra Manor Chiang Mai", "price": "~฿3,000/night", "rating": "8.9", "link": "https://www.booking.com/hotel/th/akyra-manor-chiang-mai.en-gb.html"},
-        {"name": "Pingviman Hotel", "price": "~฿2,500/night", "rating": "8.7", "link": "https://www.booking.com/hotel/th/pingviman.en-gb.html"},
-        {"name": "99 The Gallery Hotel", "price": "~฿1,800/night", "rating": "8.5", "link": "https://www.booking.com/hotel/th/99-the-gallery.en-gb.html"}
-    ],
-    "kualalumpur": [
-        {"name": "Mandarin Oriental Kuala Lumpur", "price": "~$150/night", "rating": "9.0", "link": "https://www.booking.com/hotel/my/mandarin-oriental-kuala-lumpur.en-gb.html"},
-        {"name": "Hilton Kuala Lumpur", "price": "~$100/night", "rating": "8.8", "link": "https://www.booking.com/hotel/my/hilton-kuala-lumpur.en-gb.html"},
-        {"name": "Sunway Putra Hotel", "price": "~$60/night", "rating": "8.5", "link": "https://www.booking.com/hotel/my/sunway-putra.en-gb.html"}
-    ],
-    "bangkok": [
-        {"name": "Chatrium Hotel Riverside Bangkok", "price": "~฿2,500/night", "rating": "8.9", "link": "https://www.booking.com/hotel/th/chatrium-riverside-bangkok.en-gb.html"},
-        {"name": "Ibis Bangkok Riverside", "price": "~฿1,200/night", "rating": "8.0", "link": "https://www.booking.com/hotel/th/ibis-bangkok-riverside.en-gb.html"}
-    ],
-    "phuket": [
-        {"name": "The Nai Harn", "price": "~฿4,000/night", "rating": "9.2", "link": "https://www.booking.com/hotel/th/the-nai-harn.en-gb.html"},
-        {"name": "Holiday Inn Resort Phuket", "price": "~฿2,000/night", "rating": "8.5", "link": "https://www.booking.com/hotel/th/holiday-inn-resort-phuket.en-gb.html"}
-    ],
-    "singapore": [
-        {"name": "Marina Bay Sands", "price": "~$400/night", "rating": "9.0", "link": "https://www.booking.com/hotel/sg/marina-bay-sands.en-gb.html"},
-        {"name": "Hotel Boss", "price": "~$100/night", "rating": "8.0", "link": "https://www.booking.com/hotel/sg/boss.en-gb.html"}
-    ],
-    "roma": [
-        {"name": "Hotel Artemide", "price": "~€150/night", "rating": "9.3", "link": "https://www.booking.com/hotel/it/artemide-roma.en-gb.html"},
-        {"name": "NH Collection Roma Palazzo Cinquecento", "price": "~€200/night", "rating": "8.8", "link": "https://www.booking.com/hotel/it/nh-collection-palazzo-cinquecento.en-gb.html"},
-        {"name": "Hotel Hiberia", "price": "~€100/night", "rating": "8.5", "link": "https://www.booking.com/hotel/it/hiberia.en-gb.html"}
-    ],
-    "tokyo": [  # Added for Tokyo
-        {"name": "The Prince Park Tower Tokyo", "price": "~¥20,000/night", "rating": "9.0", "link": "https://www.booking.com/hotel/jp/the-prince-park-tower-tokyo.en-gb.html"},
-        {"name": "Hotel Gracery Shinjuku", "price": "~¥15,000/night", "rating": "8.5", "link": "https://www.booking.com/hotel/jp/gracery-shinjuku.en-gb.html"},
-        {"name": "APA Hotel Asakusa Tawaramachi Ekimae", "price": "~¥10,000/night", "rating": "8.2", "link": "https://www.booking.com/hotel/jp/apa-asakusa-tawaramachi-ekimae.en-gb.html"}
-    ]
-    # Add more here
-}
-
-FALLBACK_ATTRACTIONS = {
-    "chiangmai": [
-        "Doi Inthanon National Park (highest peak in Thailand)",
-        "Wat Phra That Doi Suthep (iconic temple with views)",
-        "Elephant Nature Park (ethical sanctuary)",
-        "Night Bazaar (shopping and street food)",
-        "Old City Temples (historic sites like Wat Chedi Luang)"
-    ],
-    "kualalumpur": [
-        "Petronas Twin Towers (iconic skyscrapers with views)",
-        "Batu Caves (Hindu temple in limestone caves)",
-        "KLCC Park (urban green space near towers)",
-        "Central Market (shopping for souvenirs and food)",
-        "Jalan Alor (street food heaven)"
-    ],
-    "bangkok": [
-        "Grand Palace (historic royal complex)",
-        "Wat Arun (Temple of Dawn)",
-        "Chatuchak Weekend Market (huge shopping area)",
-        "Chao Phraya River (boat rides)"
-    ],
-    "phuket": [
-        "Patong Beach (vibrant nightlife and sands)",
-        "Big Buddha (giant statue with views)",
-        "Phi Phi Islands (day trip to paradise)"
-    ],
-    "singapore": [
-        "Gardens by the Bay (futuristic gardens)",
-        "Marina Bay Sands (infinity pool and views)",
-        "Sentosa Island (beaches and attractions)"
-    ],
-    "roma": [
-        "Colosseum (ancient amphitheater and gladiator arena)",
-        "Vatican Museums & St. Peter's Basilica (art and history)",
-        "Trevi Fountain (iconic baroque fountain)",
-        "Pantheon (ancient Roman temple)",
-        "Roman Forum (ruins of ancient government buildings)"
-    ],
-    "tokyo": [  # Added for Tokyo (based on quick sim—I tested the scraper in a tool, but it flopped, so fallback is key)
-        "Tokyo Tower (iconic landmark with views)",
-        "Shibuya Crossing (busiest intersection in the world)",
-        "Senso-ji Temple (ancient Buddhist temple in Asakusa)",
-        "Akihabara (electronics and anime district)",
-        "Meiji Shrine (serene Shinto shrine in a forest)"
-    ]
-    # Add more here
-}
-
-# Helper for transport with enhanced fallback and clearer formatting
-def search_transport(start, dest, date_start, date_end):
-    try:
-        # Primary: Rome2Rio
-        url = f"https://www.rome2rio.com/search/{start}/{dest}?departureDate={date_start}"
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        options = []
-        for item in soup.select('.route__details, .itinerary-item'):
-            mode = item.select_one('.route__title, .mode').text.strip() if item.select_one('.route__title, .mode') else "Unknown"
-            price = item.select_one('.route__price, .price').text.strip() if item.select_one('.route__price, .price') else "N/A"
-            link = item.select_one('a')['href'] if item.select_one('a') else "/"
-            full_link = f"https://www.rome2rio.com{link}" if link.startswith('/') else link  # Ensure full URL
-            options.append({"mode": mode, "price": price, "link": full_link})
-        
-        if len(options) < 2:  # Enhanced fallback: More Google results and estimates
-            google_query = f"cheap flights or transport from {start} to {dest} on {date_start} prices"  # Tweaked query for better international hits
-            google_url = f"https://www.google.com/search?q={requests.utils.quote(google_query)}"
-            response = requests.get(google_url, headers={'User-Agent': 'Mozilla/5.0'})
-            soup = BeautifulSoup(response.text, 'html.parser')
-            for result in soup.select('.tF2Cxc')[:5]:  # Up to 5 for better coverage
-                title = result.select_one('h3').text if result.select_one('h3') else "Option"
-                snippet = result.select_one('.VwiC3b').text if result.select_one('.VwiC3b') else ""
-                price_match = re.search(r'\$?\d+[\d,.]*', snippet)
-                price = price_match.group(0) if price_match else "~$20-40 (estimated)"
-                duration_match = re.search(r'\d+ ?(h|hour|min)', snippet)
-                duration = duration_match.group(0) if duration_match else "~5-10h"
-                link = result.select_one('a')['href'] if result.select_one('a') else google_url
-                options.append({"mode": f"{title} ({duration})", "price": price, "link": link})
-            
-            # Use modular fallback if available
-            dest_key = dest.lower().replace(" ", "")
-            if dest_key in FALLBACK_TRANSPORTS:
-                options.extend(FALLBACK_TRANSPORTS[dest_key])
-        
-        options = [opt for opt in options if opt['price'] != "N/A"]  # Filter junk
-        options.sort(key=lambda x: float(re.sub(r'[^\d.]', '', x['price'])) if re.sub(r'[^\d.]', '', x['price']) else float('inf'))
-        return options[:3] or [{"mode": "No specific options found", "price": "", "link": google_url}]
-    except Exception as e:
-        return [{"mode": "Error: " + str(e), "price": "", "link": ""}]
-
-# Helper for hotels with improved fallback and encoding fix
-def search_hotels(dest, date_start, date_end):
-    hotels = []
-    try:
-        # Primary: Booking.com
-        url = f"https://www.booking.com/searchresults.html?ss={dest}&checkin={date_start}&checkout={date_end}&group_adults=2&no_rooms=1&order=price"
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
-        response.encoding = 'utf-8'  # Force UTF-8 to handle characters
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        for item in soup.find_all('div', {'data-testid': 'property-card'}):
-            name = item.find('div', {'data-testid': 'title'}).text.strip() if item.find('div', {'data-testid': 'title'}) else "Unknown Hotel"
-            price = item.find('span', {'data-testid': 'price-and-discounted-price'}).text.strip() if item.find('span', {'data-testid': 'price-and-discounted-price'}) else "Price N/A"
-            rating = item.find('div', {'data-testid': 'review-score'}).text.strip().split()[0] if item.find('div', {'data-testid': 'review-score'}) else "Rating N/A"
-            link = item.find('a', {'data-testid': 'title-link'})['href'] if item.find('a', {'data-testid': 'title-link'}) else "https://www.booking.com"
-            hotels.append({"name": name, "price": price, "rating": rating, "link": link})
-    except Exception as e:
-        st.warning(f"Booking.com scrape failed: {str(e)}. Falling back to Google search.")
-
-    if len(hotels) < 2:  # Fallback to Google with encoding fix (now up to 5 results)
-        try:
-            google_query = f"best hotels in {dest} {date_start} to {date_end} prices ratings"
-            google_url = f"https://www.google.com/search?q={requests.utils.quote(google_query)}"
-            response = requests.get(google_url, headers={'User-Agent': 'Mozilla/5.0'})
-            response.encoding = 'utf-8'
-            soup = BeautifulSoup(response.text, 'html.parser')
-            for result in soup.select('.tF2Cxc')[:5]:  # More results for reliability
-                title = result.select_one('h3').text if result.select_one('h3') else "Hotel"
-                snippet = result.select_one('.VwiC3b').text if result.select_one('.VwiC3b') else ""
-                price_match = re.search(r'\$?\d+[\d,.]*|฿\d+[\d,.]*|€\d+[\d,.]*|¥\d+[\d,.]*', snippet)  # Handle USD, THB, EUR, JPY
-                price = price_match.group(0) if price_match else "Check site"
-                rating_match = re.search(r'\d\.\d', snippet)
-                rating = rating_match.group(0) if rating_match else "N/A"
-                link = result.select_one('a')['href'] if result.select_one('a') else google_url
-                hotels.append({"name": title, "price": price, "rating": rating, "link": link})
-        except Exception as e:
-            st.warning(f"Google fallback failed: {str(e)}. Using hardcoded options.")
-
-        # Use modular fallback if available
-        dest_key = dest.lower().replace(" ", "")
-        if dest_key in FALLBACK_HOTELS and len(hotels) < 2:
-            hotels.extend(FALLBACK_HOTELS[dest_key])
-
-    if not hotels:
-        return [{"name": "No specific hotels found", "price": "N/A", "rating": "N/A", "link": "https://www.google.com/search?q=hotels+in+" + requests.utils.quote(dest)}]
-
-    # Sort by price
-    def score(h):
-        p = float(re.sub(r'[^\d.]', '', h['price'])) if re.sub(r'[^\d.]', '', h['price']) else float('inf')
-        return p
-    hotels.sort(key=score)
-    return hotels[:3]
-
-# Helper for attractions and itinerary with dynamic web search fallback
-def get_attractions(dest, date_start, date_end):
-    try:
-        google_query = f"top attractions in {dest} things to do"
-        google_url = f"https://www.google.com/search?q={requests.utils.quote(google_query)}"
-        response = requests.get(google_url, headers={'User-Agent': 'Mozilla/5.0'})
-        response.encoding = 'utf-8'
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        attractions = []
-        for result in soup.select('.tF2Cxc')[:5]:
-            title = result.select_one('h3').text if result.select_one('h3') else ""
-            if title:
-                attractions.append(title)
-        
-        if len(attractions) < 3:  # Dynamic fallback using modular dict
-            dest_key = dest.lower().replace(" ", "")
-            if dest_key in FALLBACK_ATTRACTIONS:
-                attractions = FALLBACK_ATTRACTIONS[dest_key]
-            else:
-                attractions = ["Local highlights—search for more details! Try [TripAdvisor](https://www.tripadvisor.com/Attractions) for more."]  # General with link
-        
-        # Generate itinerary based on attractions
-        start_dt = datetime.datetime.strptime(date_start, '%Y-%m-%d')
-        end_dt = datetime.datetime.strptime(date_end, '%Y-%m-%d')
-        days = (end_dt - start_dt).days + 1
-        itinerary = []
-        for i in range(days):
-            attr = attractions[i % len(attractions)] if attractions else "Free day to explore"
-            itinerary.append(f"Day {i+1}: Visit {attr}. Enjoy local cuisine and relax!")
-        
-        return attractions, "\n".join(itinerary), days
-    except Exception as e:
-        return [str(e)], "Error generating itinerary. Try manually!", 1
-
-# Function to estimate total cost (rough calculation)
-def estimate_total_cost(transports, hotels, days, travelers):
-    # Transport: Cheapest per person, one-way (assume round-trip x2)
-    trans_price = 0
-    if transports and transports[0]['price'] and transports[0]['price'] != "N/A":
-        trans_str = re.sub(r'[^\d.]', '', transports[0]['price'].split('-')[0])  # Take low end
-        trans_price = float(trans_str) * 2 * travelers if trans_str else 50 * travelers  # Default $50/pp round-trip
-    
-    # Hotels: Cheapest per night, assume per room (divide by 2 if >1 traveler, rough)
-    hotel_price = 0
-    if hotels and hotels[0]['price'] and hotels[0]['price'] != "N/A":
-        hotel_str = re.sub(r'[^\d.]', '', hotels[0]['price'].split('-')[0])  # Take low end
-        per_night = float(hotel_str) if hotel_str else 50
-        room_factor = max(1, travelers / 2)  # Rough: 1 room for 1-2, more for larger groups
-        hotel_price = per_night * days * room_factor
-    
-    # Other: $50/day/person for attractions, food, etc.
-    other_price = 50 * days * travelers
-    
-    total = trans_price + hotel_price + other_price
-    return trans_price, hotel_price, other_price, total
+    st.caption(f"{trace['label']}: {trace['duration_ms']:.0f} ms, {len(rows)} spans")
+    st.vega_lite_chart(rows, {
+        "mark": "bar",
+        "encoding": {
+            "y": {"field": "step", "type": "nominal", "sort": None, "title": None},
+            "x": {"field": "start_ms", "type": "quantitative", "title": "ms since plan start"},
+            "x2": {"field": "end_ms"},
+            "color": {"field": "outcome", "type": "nominal"},
+            "tooltip": [{"field": "step"}, {"field": "start_ms"}, {"field": "end_ms"}, {"field": "outcome"}],
+        },
+    })
+    st.json(metrics.snapshot(), expanded=False)
 
 # Streamlit app
-st.set_page_config(page_title="Epic Travel Planner", page_icon="✈️")
 st.title("Epic Travel Planner 🌍")
 st.markdown("Plan your dream trip with real-time deals and itineraries! Powered by web magic.")
 
@@ -337,46 +113,111 @@ date_start_str = str(date_start)
 date_end_str = str(date_end)
 
 travelers = st.number_input("Number of Travelers", min_value=1, max_value=10, value=2, step=1)
+flexible = st.checkbox("My dates are flexible (±3 days)")
+show_timings = st.sidebar.checkbox("Developer: timing waterfall")
 
 if st.button("Plan My Trip! 🚀"):
     if start and dest:
         st.write(f"Planning your adventure from {start} to {dest} for {date_start_str} to {date_end_str} with {travelers} travelers...")
+        prefetch.record(start, dest, date_start_str, date_end_str)  # No-op unless prefetching is configured
         
-        # Transport
+        # Lay out the sections up front and fill each one as soon as its result arrives
         st.subheader("Best Transport Options (Quality/Price) 🚌✈️")
-        transports = search_transport(start, dest, date_start_str, date_end_str)
-        if transports[0]['mode'] != "No specific options found" and "Error" not in transports[0]['mode']:
-            for t in transports:
-                st.markdown(f"- **{t['mode']}** for {t['price']}: [Book here]({t['link']})")
-        else:
-            google_link = f"https://www.google.com/search?q=transport+from+{requests.utils.quote(start)}+to+{requests.utils.quote(dest)}+{date_start_str}"
-            st.warning(f"No specific transport options found. [Search manually on Google]({google_link}) or try different dates!")
-        
-        # Hotels
+        transport_box = st.empty()
         st.subheader("Best Hotel Options (Quality/Price) 🏨")
-        hotels = search_hotels(dest, date_start_str, date_end_str)
-        if hotels[0]['name'] != "No specific hotels found" and "Error" not in hotels[0]['name']:
-            for h in hotels:
-                st.markdown(f"- **{h['name']}** - Rating: {h['rating']}, Price: {h['price']}: [Book here]({h['link']})")
-        else:
-            google_link = f"https://www.google.com/search?q=hotels+in+{requests.utils.quote(dest)}+{date_start_str}+to+{date_end_str}"
-            st.warning(f"No specific hotels found. [Search manually on Google]({google_link})!")
-        
-        # Attractions
+        hotel_box = st.empty()
         st.subheader("Major Attractions & Itinerary 📍")
-        attractions, itinerary, days = get_attractions(dest, date_start_str, date_end_str)
-        st.markdown("**Top Attractions:**")
-        for attr in attractions:
-            st.markdown(f"- {attr}")
-        st.markdown("**Detailed Plan:**\n" + itinerary.replace("\n", "\n\n"))  # Add spacing for clarity
+        attraction_box = st.empty()
+        for box in (transport_box, hotel_box, attraction_box):
+            box.info("Searching... ⏳")
+
+        # Fill each section from the event stream: partial results as each provider answers, then the final pick
+        boxes = {"transport": transport_box, "hotels": hotel_box, "attractions": attraction_box}
+        partial = {section: [] for section in boxes}
+        notes = {section: [] for section in boxes}
+        sources = {section: [] for section in boxes}
+        with metrics.tracing(f"{start} -> {dest} {date_start_str}..{date_end_str}") as trace:
+            for event in plan_events(start, dest, date_start_str, date_end_str):
+                section = event.section
+                if event.kind == "result":
+                    partial[section].extend(event.data)
+                    sources[section].append(event.provider)
+                elif event.kind != "done":  # "fallback", "hedge", "skip" or "error"
+                    notes[section].append(f"{event.provider}: {event.data}")
+                with boxes[section].container():
+                    if event.kind != "done":
+                        if section == "transport":
+                            st.markdown(transports_md(sorted(partial[section], key=sort_key)[:3]))
+                        elif section == "hotels":
+                            st.markdown(hotels_md(sorted(partial[section], key=sort_key)[:3]))
+                        else:
+                            st.markdown(attractions_md(partial[section][:5]))
+                        st.caption(" · ".join(notes[section] + ["Still searching... ⏳"]))
+                        continue
+                    if section == "transport":
+                        # Transport
+                        transports = event.data
+                        if transports[0]['mode'] != "No specific options found" and "Error" not in transports[0]['mode']:
+                            st.markdown(transports_md(transports))
+                        else:
+                            google_link = f"https://www.google.com/search?q=transport+from+{quote(start)}+to+{quote(dest)}+{date_start_str}"
+                            st.warning(f"No specific transport options found. [Search manually on Google]({google_link}) or try different dates!")
+                    elif section == "hotels":
+                        # Hotels
+                        hotels, _ = event.data  # Scrape warnings already arrived as error events (shown in the caption)
+                        if hotels[0]['name'] != "No specific hotels found" and "Error" not in hotels[0]['name']:
+                            st.markdown(hotels_md(hotels))
+                        else:
+                            google_link = f"https://www.google.com/search?q=hotels+in+{quote(dest)}+{date_start_str}+to+{date_end_str}"
+                            st.warning(f"No specific hotels found. [Search manually on Google]({google_link})!")
+                    else:
+                        # Attractions
+                        attractions, itinerary, days = event.data
+                        st.markdown("**Top Attractions:**\n" + attractions_md(attractions) + "\n\n**Detailed Plan:**\n\n" + itinerary.replace("\n", "\n\n"))  # Add spacing for clarity
+                    st.caption(" · ".join(notes[section] + ["From " + ", ".join(sources[section]) if sources[section] else "From cache"]))
+        st.session_state['last_trace'] = trace.to_dict()
         
         # Total Cost Estimate
         st.subheader("Estimated Total Cost 💰")
-        trans_est, hotel_est, other_est, total_est = estimate_total_cost(transports, hotels, days, travelers)
+        daily = daily_cost(dest)
+        trans_est, hotel_est, other_est, total_est = estimate_total_cost(transports, hotels, days, travelers, daily)
         st.markdown(f"*Rough estimate based on cheapest options (per person where applicable). Actual costs may vary!*")
         st.markdown(f"- Transport (round-trip): ~${trans_est:.2f}")
         st.markdown(f"- Hotels ({days} nights): ~${hotel_est:.2f}")
-        st.markdown(f"- Attractions/Food/Misc ($50/day/person): ~${other_est:.2f}")
+        st.markdown(f"- Attractions/Food/Misc (${daily:.0f}/day/person): ~${other_est:.2f}")
         st.markdown(f"**Grand Total for {travelers} travelers: ~${total_est:.2f}**")
+
+        # Every transport x hotel pairing, best value first: total cost adjusted for the hotel's rating (costs.RATING_WEIGHT)
+        with st.expander("Compare options 📊"):
+            st.table([
+                {
+                    "Transport": combo["transport"]["mode"] if combo["transport"] else "-",
+                    "Hotel": combo["hotel"]["name"] if combo["hotel"] else "-",
+                    "Rating": f"{combo['rating']:.1f}/10" if combo["rating"] else "-",
+                    "Total": f"~${combo['costs']['total']:.2f}",
+                }
+                for combo in rank(transports, hotels, days, travelers, limit=5, daily=daily)
+            ])
+
+        if flexible:
+            with st.spinner("Checking nearby start dates... ⏳"):
+                dates = sweep_dates(start, dest, date_start_str, date_end_str, travelers)
+            yours = next((d["costs"]["total"] for d in dates if d["date_start"] == date_start_str), total_est)
+            if dates and round(dates[0]["costs"]["total"], 2) < round(yours, 2):  # Ties (e.g. catalog prices) aren't savings
+                best = dates[0]
+                st.success(f"Cheapest within ±3 days: {best['date_start']} to {best['date_end']}, ~${best['costs']['total']:.2f} "
+                           f"(saves ~${yours - best['costs']['total']:.2f})")
+            elif dates:
+                st.info("Your dates are already the cheapest within ±3 days.")
+
+        # Cache counters since this server process started
+        hits = sum(s['hits'] + s['stale'] for s in result_cache.stats.values())
+        misses = sum(s['misses'] for s in result_cache.stats.values())
+        st.caption(f"Result cache: {hits} hits / {misses} misses")
     else:
         st.warning("Please fill in starting location and destination!")
+
+# Developer panel, kept across reruns until the next plan replaces it
+if show_timings and 'last_trace' in st.session_state:
+    with st.expander("Timing waterfall (latest plan) ⏱️", expanded=True):
+        show_waterfall(st.session_state['last_trace'])
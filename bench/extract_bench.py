@@ -0,0 +1,55 @@
+import argparse
+import time
+
+from bench import fixtures
+from planner import extract
+
+# CPU time of the HTML extraction step per backend, on the fixture pages.
+# A typical plan parses one Rome2Rio page, one Booking.com page and up to three Google pages.
+#   python -m bench.extract_bench --repeat 20
+
+PLAN = (("rome2rio", None), ("booking", None), ("google", 5), ("google", 5), ("google", 5))
+
+
+def available_backends():
+    names = []
+    for backend in extract.BACKENDS:
+        try:
+            extract.extract("<html></html>", "google", backend=backend)
+            names.append(backend)
+        except ImportError:
+            pass
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML extraction backends")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    pages = {name: fixtures.load(name) for name in fixtures.NAMES}
+    print("Fixture sizes: " + ", ".join(f"{name} {len(html) // 1024} KB" for name, html in pages.items()))
+
+    backends = available_backends()
+    baseline = None
+    expected = None
+    for backend in backends:
+        rows = [extract.extract(pages[scope], scope, limit=limit, backend=backend) for scope, limit in PLAN]
+        if expected is None:
+            expected = rows
+        elif rows != expected:
+            print(f"  warning: {backend} output differs from {backends[0]}")
+        start = time.process_time()
+        for _ in range(args.repeat):
+            for scope, limit in PLAN:
+                extract.extract(pages[scope], scope, limit=limit, backend=backend)
+        per_plan = (time.process_time() - start) / args.repeat * 1000
+        if backend == "legacy":
+            baseline = per_plan
+        print(f"{backend:12s} {per_plan:8.1f} ms CPU/plan")
+    if baseline:
+        print(f"(legacy = old full BeautifulSoup parse, {baseline:.1f} ms CPU/plan)")
+
+
+if __name__ == "__main__":
+    main()
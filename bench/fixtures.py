@@ -0,0 +1,60 @@
+import os
+import random
+
+# Provider pages for the benchmarks. A recorded page saved as bench/fixtures/<name>.html is used
+# when present; otherwise a synthetic page with the same markup shape and a realistic size is built.
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+NAMES = ("google", "booking", "rome2rio")
+
+
+# Page chrome that real provider pages are mostly made of: inline scripts, nav menus, tracking divs
+def _filler(rng, kb):
+    parts = []
+    size = 0
+    while size < kb * 1024:
+        block = rng.choice((
+            "<script>window.__data=" + "{\"k\":\"%s\"}," % ("x" * rng.randint(50, 400)) * 20 + "{};</script>",
+            "<nav><ul>" + "".join(f"<li class='nav-item'><a href='/p/{i}'>Link {i}</a></li>" for i in range(30)) + "</ul></nav>",
+            "<div class='promo'><div><div><span>Deal</span><p>" + "Lorem ipsum dolor sit amet. " * 20 + "</p></div></div></div>",
+        ))
+        parts.append(block)
+        size += len(block)
+    return "".join(parts)
+
+
+def _google(rng):
+    results = "".join(
+        f"<div class='g'><div class='tF2Cxc'><a href='https://example.com/r{i}'><h3>Result {i} - Top pick</h3></a>"
+        f"<div class='VwiC3b'>From ${rng.randint(20, 400)} per night, rated {rng.randint(60, 95) / 10} by guests. Travel time {rng.randint(1, 12)}h.</div></div></div>"
+        for i in range(10)
+    )
+    return f"<html><head><title>Google</title></head><body>{_filler(rng, 250)}<div id='search'>{results}</div>{_filler(rng, 150)}</body></html>"
+
+
+def _booking(rng):
+    cards = "".join(
+        f"<div data-testid='property-card'><div class='c1'><a data-testid='title-link' href='https://www.booking.com/hotel/xx/h{i}.html'>"
+        f"<div data-testid='title'>Hotel {i}</div></a><div data-testid='review-score'><div>{rng.randint(60, 98) / 10}</div><div>Very good</div></div>"
+        f"<span data-testid='price-and-discounted-price'>US${rng.randint(30, 500)}</span>{_filler(rng, 8)}</div></div>"
+        for i in range(25)
+    )
+    return f"<html><head><title>Booking.com</title></head><body>{_filler(rng, 400)}<div id='results'>{cards}</div>{_filler(rng, 200)}</body></html>"
+
+
+def _rome2rio(rng):
+    routes = "".join(
+        f"<div class='route__details'><h2 class='route__title'>{mode}</h2><span class='route__price'>${rng.randint(5, 300)}-{rng.randint(301, 600)}</span>"
+        f"<a href='/map/route-{i}'>Details</a></div>"
+        for i, mode in enumerate(("Fly", "Bus", "Train", "Drive", "Taxi", "Bus, fly", "Train, bus", "Ferry"))
+    )
+    return f"<html><head><title>Rome2Rio</title></head><body>{_filler(rng, 200)}<div class='routes'>{routes}</div>{_filler(rng, 100)}</body></html>"
+
+
+def load(name):
+    path = os.path.join(FIXTURE_DIR, name + ".html")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    rng = random.Random(name)  # Deterministic per page so runs are comparable
+    return {"google": _google, "booking": _booking, "rome2rio": _rome2rio}[name](rng)
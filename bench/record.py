@@ -0,0 +1,34 @@
+import argparse
+import os
+from urllib.parse import quote
+
+from planner import fetch
+from bench import fixtures
+
+# Record live provider pages into bench/fixtures/ so the benchmarks replay real markup.
+#   python -m bench.record --start Pattaya --dest Bangkok --date 2026-11-01 --until 2026-11-05
+
+def main():
+    parser = argparse.ArgumentParser(description="Save live provider responses as benchmark fixtures")
+    parser.add_argument("--start", default="Pattaya")
+    parser.add_argument("--dest", default="Bangkok")
+    parser.add_argument("--date", required=True, help="Departure/check-in date (YYYY-MM-DD)")
+    parser.add_argument("--until", required=True, help="Check-out date (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    urls = {
+        "rome2rio": f"https://www.rome2rio.com/search/{args.start}/{args.dest}?departureDate={args.date}",
+        "booking": f"https://www.booking.com/searchresults.html?ss={args.dest}&checkin={args.date}&checkout={args.until}&group_adults=2&no_rooms=1&order=price",
+        "google": f"https://www.google.com/search?q={quote(f'best hotels in {args.dest} {args.date} to {args.until} prices ratings')}",
+    }
+    os.makedirs(fixtures.FIXTURE_DIR, exist_ok=True)
+    for name, url in urls.items():
+        response = fetch.get(url, encoding='utf-8')
+        path = os.path.join(fixtures.FIXTURE_DIR, name + ".html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(response.text)
+        print(f"{name}: HTTP {response.status_code}, {len(response.text) // 1024} KB -> {path}")
+
+
+if __name__ == "__main__":
+    main()
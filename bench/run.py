@@ -0,0 +1,151 @@
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import planner as app
+from bench import fixtures
+from bench.server import StubServer
+from planner import extract, fetch
+from planner.cache import result_cache
+from planner.singleflight import flights
+
+# Offline benchmark harness: stands up a stub server per provider, points the scrapers at them
+# and drives the planner helpers directly. Writes a JSON report and can compare against a previous one.
+#   python -m bench.run --latency 0.2 --fail-rate 0.05 --out bench_results.json
+#   python -m bench.run --compare bench_results.json
+
+START, DEST = "Pattaya", "Bangkok"
+DATE_START, DATE_END = "2026-11-01", "2026-11-05"
+HOSTS = {"rome2rio": "www.rome2rio.com", "booking": "www.booking.com", "google": "www.google.com"}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def scenarios():
+    transports = app.search_transport(START, DEST, DATE_START, DATE_END)
+    hotels = app.search_hotels(DEST, DATE_START, DATE_END, [])
+    pages = {name: fixtures.load(name) for name in fixtures.NAMES}
+    return {
+        "transport": lambda: app.search_transport(START, DEST, DATE_START, DATE_END),
+        "hotels": lambda: app.search_hotels(DEST, DATE_START, DATE_END, []),
+        "attractions": lambda: app.get_attractions(DEST, DATE_START, DATE_END),
+        "estimate_total_cost": lambda: app.estimate_total_cost(transports, hotels, 5, 2),
+        "plan": lambda: app.plan_trip(START, DEST, DATE_START, DATE_END, 2),
+        # Network vs parse split: the raw fetch of each provider page, and extraction of the same pages
+        "network": lambda: [fetch.get(f"https://{host}/bench") for host in HOSTS.values()],
+        "parse": lambda: [extract.extract(pages[name], name) for name in fixtures.NAMES],
+    }
+
+
+def measure(fn, iterations, concurrency):
+    latencies = []
+
+    def timed():
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+
+    fn()  # Warm-up: imports, connection pool, selector compilation
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(timed) for _ in range(iterations)]:
+            future.result()
+    wall = time.perf_counter() - wall_start
+
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "throughput_per_s": iterations / wall,
+        "peak_alloc_kb": peak / 1024,
+    }
+
+
+# Flag scenarios whose p95 got worse than the baseline report by more than `tolerance`
+def compare(report, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = []
+    for name, result in report["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if old and result["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {old['p95_ms']:.1f} ms -> {result['p95_ms']:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline planner benchmarks against local stub providers")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.1, help="Stub response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of stub responses that are 503s")
+    parser.add_argument("--rate-limits", action="store_true", help="Keep the real per-host rate limits (off by default so they don't dominate)")
+    parser.add_argument("--scenario", action="append", help="Run only these scenarios (repeatable)")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="Previous report to check for p95 regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    result_cache.enabled = False  # Measure the scrape path, not cache hits
+    flights.enabled = False  # ...nor concurrent identical calls sharing one fetch
+
+    if not args.rate_limits:
+        for host in fetch.HOST_LIMITS:
+            fetch.HOST_LIMITS[host] = {"concurrency": 64, "rate": 1e9, "burst": 1e9}
+    servers = {name: StubServer(name, args.latency, args.jitter, args.fail_rate, seed=i).start() for i, name in enumerate(HOSTS)}
+    for name, host in HOSTS.items():
+        fetch.HOST_OVERRIDES[host] = servers[name].url
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "html_backend": extract.BACKEND,
+            "latency_s": args.latency,
+            "jitter_s": args.jitter,
+            "fail_rate": args.fail_rate,
+            "concurrency": args.concurrency,
+        },
+        "scenarios": {},
+    }
+    try:
+        for name, fn in scenarios().items():
+            if args.scenario and name not in args.scenario:
+                continue
+            result = measure(fn, args.iterations, args.concurrency)
+            report["scenarios"][name] = result
+            print(f"{name:20s} p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  p99 {result['p99_ms']:8.1f} ms  "
+                  f"{result['throughput_per_s']:8.1f}/s  peak {result['peak_alloc_kb']:8.0f} KB")
+    finally:
+        for server in servers.values():
+            server.stop()
+    report["meta"]["stub_requests"] = {name: server.requests for name, server in servers.items()}
+
+    regressions = compare(report, args.compare, args.tolerance) if args.compare else []  # Before --out may overwrite it
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}")
+    for line in regressions:
+        print("REGRESSION " + line)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
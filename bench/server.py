@@ -0,0 +1,62 @@
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench import fixtures
+
+# Local stand-in for a provider: serves that provider's fixture page for every GET,
+# after a configurable delay, with optional failure injection.
+
+
+class StubServer:
+    def __init__(self, name, latency=0.0, jitter=0.0, fail_rate=0.0, seed=0):
+        self.name = name
+        self.page = fixtures.load(name).encode("utf-8")
+        self.latency = latency  # seconds added to every response
+        self.jitter = jitter  # +/- uniform seconds on top of latency
+        self.fail_rate = fail_rate  # fraction of requests answered with a 503
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real providers
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                    delay = max(0.0, stub.latency + stub._rng.uniform(-stub.jitter, stub.jitter))
+                    failed = stub._rng.random() < stub.fail_rate
+                time.sleep(delay)
+                body = b"Service Unavailable" if failed else stub.page
+                self.send_response(503 if failed else 200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,29 @@
+# Headless trip planner: scraping, caching and costing, with no Streamlit dependency.
+#   from planner import plan_trip
+#   plan = plan_trip("Pattaya", "Bangkok", "2026-11-01", "2026-11-05", travelers=2)
+# Submodules (and their requests/bs4/parser imports) load on first attribute access.
+
+import importlib
+
+_EXPORTS = {
+    "plan_trip": "core",
+    "plan_sections": "core",
+    "plan_events": "core",
+    "sweep_dates": "core",
+    "search_transport": "search",
+    "search_hotels": "search",
+    "get_attractions": "search",
+    "estimate_total_cost": "costs",
+    "rank": "costs",
+    "daily_cost": "costs",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'planner' has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
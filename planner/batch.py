@@ -0,0 +1,186 @@
+import argparse
+import csv
+import datetime
+import json
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .cache import make_key
+from .core import build_plan
+from .search import get_attractions, search_hotels, search_transport
+
+# Headless bulk planning: read trips from CSV or JSONL, share identical sub-queries between trips,
+# and append each finished plan to a JSONL file. Re-running with the same output resumes where it stopped
+# and retries failed trips (their new line comes after the old error line; the last line per id wins).
+#   python -m planner.batch trips.csv --out plans.jsonl --workers 8
+# Input columns/keys: start, dest, date_start, date_end, travelers (default 2), id (optional; defaults to row number)
+# A row that can't be planned (missing field, bad date or traveler count) gets an error record of its own.
+
+REQUIRED = ("start", "dest", "date_start", "date_end")
+
+
+def _json_row(line):
+    try:
+        row = json.loads(line)
+    except ValueError as e:
+        return {"error": f"invalid JSON: {e}"}
+    return row if isinstance(row, dict) else {"error": "invalid JSON: not an object"}
+
+
+# One input row as a trip; a row that fails validation keeps what it had and gets an "error" instead
+def _trip(row, index):
+    trip = {"id": str(row.get("id") or index)}
+    trip.update((key, row[key]) for key in REQUIRED + ("travelers",) if row.get(key) is not None)
+    try:
+        if "error" in row:
+            raise ValueError(row["error"])
+        missing = [key for key in REQUIRED if not str(row.get(key) or "").strip()]
+        if missing:
+            raise ValueError("missing " + ", ".join(missing))
+        for key in REQUIRED:
+            trip[key] = str(row[key]).strip()
+        dates = []
+        for key in ("date_start", "date_end"):
+            try:
+                dates.append(datetime.date.fromisoformat(trip[key]))
+            except ValueError:
+                raise ValueError(f"{key} must be a YYYY-MM-DD date, not {trip[key]!r}") from None
+        date_start, date_end = dates
+        if date_end < date_start:
+            raise ValueError("date_end is before date_start")
+        travelers = str(row.get("travelers") or 2).strip()
+        if not travelers.isdigit() or int(travelers) < 1:
+            raise ValueError(f"travelers must be a whole number of at least 1, not {travelers!r}")
+        trip["travelers"] = int(travelers)
+    except (TypeError, ValueError) as e:
+        trip["error"] = f"invalid trip: {e}"
+    return trip
+
+
+def read_trips(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            rows = (_json_row(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for index, row in enumerate(rows, 1):
+            yield _trip(row, index)
+
+
+# Ids already planned in `path`. Failed trips ({"error": ...} records) don't count, so a resume retries them.
+# A half-written last line (from a crash) is cut off so appends stay valid JSONL.
+def completed_ids(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+    records = (json.loads(line) for line in data.splitlines() if line.strip())
+    return {record["id"] for record in records if "error" not in record}
+
+
+class BatchPlanner:
+    def __init__(self, workers=8, window=None):
+        self.workers = workers
+        self.window = window or workers * 4  # Trips in flight at once; bounds memory on huge inputs
+        self.stats = {"planned": 0, "skipped": 0, "invalid": 0, "subqueries": 0, "shared": 0}
+        self.keep = self.window * 4  # Finished sub-query results kept around for later trips to reuse
+        self._pending = OrderedDict()  # sub-query key -> [future, trips still using it], oldest first
+
+    # Submit a sub-query once; later trips asking for the same key share its future
+    def _submit(self, pool, key, fn, *args):
+        entry = self._pending.get(key)
+        if entry is None:
+            entry = self._pending[key] = [pool.submit(fn, *args), 0]
+            self.stats["subqueries"] += 1
+        else:
+            self.stats["shared"] += 1
+            self._pending.move_to_end(key)
+        entry[1] += 1
+        return key
+
+    # Drop a trip's hold on a sub-query, then evict the oldest unused results beyond `keep`
+    def _release(self, key):
+        self._pending[key][1] -= 1
+        excess = len(self._pending) - self.keep
+        for old in [k for k, (_, refs) in self._pending.items() if refs == 0][:max(0, excess)]:
+            del self._pending[old]
+
+    def _queue(self, pool, trip):
+        args = (trip["dest"], trip["date_start"], trip["date_end"])
+        return {
+            "transport": self._submit(pool, make_key("transport", (trip["start"],) + args), search_transport, trip["start"], *args),
+            "hotels": self._submit(pool, make_key("hotels", args), self._hotels, *args),
+            "attractions": self._submit(pool, make_key("attractions", args), get_attractions, *args),
+        }
+
+    @staticmethod
+    def _hotels(dest, date_start, date_end):
+        warnings = []
+        return search_hotels(dest, date_start, date_end, warnings), warnings
+
+    def _finish(self, trip, keys, out):
+        try:
+            results = {section: self._pending[key][0].result() for section, key in keys.items()}
+            record = build_plan(trip["start"], trip["dest"], trip["date_start"], trip["date_end"], trip["travelers"], results)
+        except Exception as e:
+            record = {key: trip[key] for key in ("start", "dest", "date_start", "date_end", "travelers")}
+            record["error"] = str(e)
+        for key in keys.values():
+            self._release(key)
+        self._write(dict(record, id=trip["id"]), out)
+        self.stats["planned"] += 1
+
+    @staticmethod
+    def _write(record, out):
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    # Write out every in-flight trip whose sub-queries are all done; if `block`, wait until at least one is
+    def _drain(self, inflight, out, block):
+        while inflight:
+            ready = [item for item in inflight if all(self._pending[key][0].done() for key in item[1].values())]
+            for item in ready:
+                inflight.remove(item)
+                self._finish(item[0], item[1], out)
+            if ready or not block:
+                return
+            wait({self._pending[key][0] for _, keys in inflight for key in keys.values()}, return_when=FIRST_COMPLETED)
+
+    def run(self, trips, out_path):
+        done = completed_ids(out_path)
+        inflight = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool, open(out_path, "a", encoding="utf-8") as out:
+            for trip in trips:
+                if trip["id"] in done:
+                    self.stats["skipped"] += 1
+                    continue
+                if "error" in trip:
+                    self._write(trip, out)
+                    self.stats["invalid"] += 1
+                    continue
+                inflight.append((trip, self._queue(pool, trip)))
+                self._drain(inflight, out, block=len(inflight) >= self.window)
+            while inflight:
+                self._drain(inflight, out, block=True)
+        return self.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan many trips from a CSV or JSONL file")
+    parser.add_argument("trips", help="CSV or JSONL file with start, dest, date_start, date_end, travelers")
+    parser.add_argument("--out", default="plans.jsonl", help="JSONL output; existing ids are skipped (resume)")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    stats = BatchPlanner(workers=args.workers).run(read_trips(args.trips), args.out)
+    print(f"Planned {stats['planned']} trips ({stats['skipped']} already done, {stats['invalid']} invalid), "
+          f"{stats['subqueries']} sub-queries run, {stats['shared']} shared", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from functools import wraps
+
+# Two-tier result cache for the provider lookups: an in-process LRU in front of a SQLite file
+# that survives restarts and is shared by every Streamlit session on the machine.
+
+# How long a result stays fresh, per provider (seconds). Hotel prices go stale much faster than attraction lists.
+DEFAULT_TTLS = {
+    "transport": 6 * 3600,
+    "hotels": 1 * 3600,
+    "attractions": 7 * 24 * 3600,
+}
+# Once past its TTL an entry is still served (and refreshed in the background) until it is this many TTLs old
+STALE_FACTOR = 2
+
+DEFAULT_PATH = os.environ.get(
+    "VOYAGEAI_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "voyageai", "results.sqlite3"),
+)
+
+
+# Same idea as the old FALLBACK_* dict keys ("Kuala Lumpur" -> "kualalumpur"), also dropping accents and punctuation
+def normalize_place(name):
+    name = unicodedata.normalize("NFKD", name.lower())
+    return "".join(c for c in name if c.isalnum() and not unicodedata.combining(c))
+
+
+def make_key(provider, args):
+    return provider + ":" + "|".join(normalize_place(a) if isinstance(a, str) else str(a) for a in args)
+
+
+class ResultCache:
+    def __init__(self, path=DEFAULT_PATH, ttls=None, max_entries=512):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_entries = max_entries
+        self.enabled = True
+        self.stats = {}  # provider -> {"hits", "stale", "misses"}
+        self._memory = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self._db = None
+        self._refreshing = set()
+
+    # Open the disk tier lazily; if the file can't be opened we just run memory-only
+    def _conn(self):
+        if self._db is None and self.path:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                db = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, stored_at REAL, expires_at REAL, value TEXT)")
+                db.execute("DELETE FROM results WHERE expires_at < ?", (time.time(),))
+                db.commit()
+                self._db = db
+            except (OSError, sqlite3.Error):  # Unwritable directory, bad path, corrupt file
+                self.path = None
+        return self._db
+
+    # One row from the disk tier, or None (also when the file is busy or broken: the memory tier still works)
+    def _row(self, sql, args):
+        db = self._conn()
+        if db is None:
+            return None
+        try:
+            return db.execute(sql, args).fetchone()
+        except sqlite3.Error:
+            return None
+
+    def _count(self, provider, outcome):
+        self.stats.setdefault(provider, {"hits": 0, "stale": 0, "misses": 0})[outcome] += 1
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    # Returns (value, state) where state is "fresh", "stale" or None for a miss
+    def get(self, provider, key, restore=None):
+        now = time.time()
+        ttl = self.ttls[provider]
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            if entry is None or now - entry[0] >= ttl:  # Another process (e.g. the prefetcher) may have stored a newer one
+                row = self._row("SELECT stored_at, value FROM results WHERE key = ?", (key,))
+                if row and (entry is None or row[0] > entry[0]):
+                    value = json.loads(row[1])
+                    entry = (row[0], restore(value) if restore else value)
+                    self._remember(key, entry)
+        if entry is None or now - entry[0] >= ttl * STALE_FACTOR:
+            return None, None
+        return entry[1], "fresh" if now - entry[0] < ttl else "stale"
+
+    # Seconds since the entry for `key` was stored, or None if there is none
+    def age(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            row = self._row("SELECT stored_at FROM results WHERE key = ?", (key,))
+        stored = max(entry[0] if entry else 0, row[0] if row else 0)
+        return time.time() - stored if stored else None
+
+    def set(self, provider, key, value):
+        now = time.time()
+        with self._lock:
+            self._remember(key, (now, value))
+            db = self._conn()
+            if db:
+                try:
+                    db.execute(
+                        "INSERT OR REPLACE INTO results (key, stored_at, expires_at, value) VALUES (?, ?, ?, ?)",
+                        (key, now, now + self.ttls[provider] * STALE_FACTOR, json.dumps(value, ensure_ascii=False)),
+                    )
+                    db.commit()
+                except sqlite3.Error:
+                    db.rollback()  # e.g. "database is locked": keep the memory copy, skip the disk write
+
+    # Serve-stale path: refresh the entry on a background thread, at most one refresh per key at a time
+    def _revalidate(self, provider, key, fn, args, kwargs, cacheable):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                value = fn(*args, **kwargs)
+                if cacheable is None or cacheable(value):
+                    self.set(provider, key, value)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    # Decorator: key on the first `key_args` positional arguments, skip results `cacheable` rejects,
+    # and rebuild values loaded from disk with `restore` (JSON turns tuples into lists).
+    # The wrapper also gets .key(*args) and .refresh(*args, **kwargs) (look up and store, ignoring the cache) for prefetching.
+    def cached(self, provider, key_args, cacheable=None, restore=None):
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                key = make_key(provider, args[:key_args])
+                value, state = self.get(provider, key, restore)
+                if state == "fresh":
+                    self._count(provider, "hits")
+                    return value
+                if state == "stale":
+                    self._count(provider, "stale")
+                    self._revalidate(provider, key, fn, args, kwargs, cacheable)
+                    return value
+                self._count(provider, "misses")
+                value = fn(*args, **kwargs)
+                if cacheable is None or cacheable(value):
+                    self.set(provider, key, value)
+                return value
+
+            def refresh(*args, **kwargs):
+                value = fn(*args, **kwargs)
+                if cacheable is None or cacheable(value):
+                    self.set(provider, make_key(provider, args[:key_args]), value)
+                return value
+
+            wrapper.key = lambda *args: make_key(provider, args[:key_args])
+            wrapper.refresh = refresh
+            return wrapper
+        return decorate
+
+
+# Module-level instance so the memory tier outlives Streamlit's script reruns
+result_cache = ResultCache()
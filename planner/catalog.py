@@ -0,0 +1,191 @@
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+
+from .cache import normalize_place
+
+# Fallback catalog: hand-curated transport/hotel/attraction entries per city, used when scraping
+# comes back thin. The source is planner/data/catalog.jsonl (one city per line, easy to grow); it is
+# indexed into a SQLite file on first use, so a process only ever reads the rows it asks for.
+
+SOURCE_PATH = os.environ.get("VOYAGEAI_CATALOG_SOURCE", os.path.join(os.path.dirname(__file__), "data", "catalog.jsonl"))
+DEFAULT_PATH = os.environ.get(
+    "VOYAGEAI_CATALOG_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "voyageai", "catalog.sqlite3"),
+)
+MIN_PREFIX = 3  # Shortest query that may match by prefix ("kua" -> Kuala Lumpur)
+KINDS = ("transports", "hotels", "attractions")
+TOKENS = re.compile(r"[\s,]+")
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE cities (id INTEGER PRIMARY KEY, key TEXT UNIQUE, name TEXT, country TEXT, daily REAL);
+CREATE TABLE aliases (alias TEXT PRIMARY KEY, city_id INTEGER);
+CREATE TABLE entries (city_id INTEGER, kind TEXT, position INTEGER, data TEXT, PRIMARY KEY (city_id, kind, position));
+"""
+
+
+def _source_version(source):
+    st = os.stat(source)
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+# Stream the JSONL source into an empty database
+def _load(db, source):
+    db.executescript(SCHEMA)
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            city = json.loads(line)
+            city_id = db.execute(
+                "INSERT INTO cities (key, name, country, daily) VALUES (?, ?, ?, ?)",
+                (city["key"], city.get("name", city["key"]), city.get("country", ""), city.get("daily")),
+            ).lastrowid
+            aliases = {normalize_place(a) for a in [city["key"], city.get("name", "")] + city.get("aliases", [])}
+            db.executemany("INSERT OR IGNORE INTO aliases (alias, city_id) VALUES (?, ?)", [(a, city_id) for a in aliases if a])
+            db.executemany(
+                "INSERT INTO entries (city_id, kind, position, data) VALUES (?, ?, ?, ?)",
+                [(city_id, kind, i, json.dumps(item, ensure_ascii=False)) for kind in KINDS for i, item in enumerate(city.get(kind, []))],
+            )
+    db.execute("INSERT INTO meta (name, value) VALUES ('source_version', ?)", (_source_version(source),))
+    db.commit()
+
+
+# Build a fresh SQLite file, then swap it in atomically
+def build(source=SOURCE_PATH, path=DEFAULT_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    db = sqlite3.connect(tmp)
+    _load(db, source)
+    db.close()
+    os.replace(tmp, path)
+
+
+class Catalog:
+    def __init__(self, path=DEFAULT_PATH, source=SOURCE_PATH):
+        self.path = path
+        self.source = source
+        self._db = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        version = _source_version(self.source)
+        try:
+            db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            current = db.execute("SELECT value FROM meta WHERE name = 'source_version'").fetchone()
+        except sqlite3.Error:
+            db, current = None, None
+        if not current or current[0] != version:
+            if db:
+                db.close()
+            build(self.source, self.path)
+            db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        return db
+
+    # Open lazily, (re)building the index when it is missing or older than the source file.
+    # If the index file can't be written, index into memory for this process; if even the source
+    # can't be read, the catalog is empty. Either way it is decided once, not on every lookup.
+    def _conn(self):
+        if self._db is None:
+            try:
+                self._db = self._open()
+            except (OSError, sqlite3.Error) as e:
+                log.warning("Catalog index %s unavailable (%s); indexing in memory", self.path, e)
+                try:
+                    db = sqlite3.connect(":memory:", check_same_thread=False)
+                    _load(db, self.source)
+                    self._db = db
+                except (OSError, ValueError, sqlite3.Error) as e:
+                    log.warning("Catalog source %s unreadable (%s); no fallback data", self.source, e)
+                    self._db = False
+        return self._db or None
+
+    # City id for a name: exact alias, then the shortest alias starting with the query,
+    # then the longest alias made of the query's leading words ("Rome, Italy" -> "rome", but not "Romania")
+    def resolve(self, name):
+        query = normalize_place(name or "")
+        if not query:
+            return None
+        with self._lock:
+            db = self._conn()
+            if db is None:
+                return None
+            row = db.execute("SELECT city_id FROM aliases WHERE alias = ?", (query,)).fetchone()
+            if not row and len(query) >= MIN_PREFIX:
+                row = db.execute(
+                    "SELECT city_id FROM aliases WHERE alias > ? AND alias < ? ORDER BY length(alias) LIMIT 1",
+                    (query, query + "\uffff"),
+                ).fetchone()
+            if not row:
+                words = [w for w in TOKENS.split(name) if w]
+                heads = [normalize_place("".join(words[:n])) for n in range(len(words) - 1, 0, -1)]
+                for head in heads:
+                    if len(head) > MIN_PREFIX:
+                        row = db.execute("SELECT city_id FROM aliases WHERE alias = ?", (head,)).fetchone()
+                        if row:
+                            break
+        return row[0] if row else None
+
+    def entries(self, name, kind):
+        city_id = self.resolve(name)
+        if city_id is None:
+            return []
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT data FROM entries WHERE city_id = ? AND kind = ? ORDER BY position", (city_id, kind)
+            ).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def city(self, name):
+        city_id = self.resolve(name)
+        if city_id is None:
+            return None
+        with self._lock:
+            key, display, country, daily = self._conn().execute("SELECT key, name, country, daily FROM cities WHERE id = ?", (city_id,)).fetchone()
+        return {"key": key, "name": display, "country": country, "daily": daily}  # daily: food/attractions per person per day
+
+    def transports(self, name):
+        return self.entries(name, "transports")
+
+    def hotels(self, name):
+        return self.entries(name, "hotels")
+
+    def attractions(self, name):
+        return self.entries(name, "attractions")
+
+
+catalog = Catalog()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the fallback catalog")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="Rebuild the SQLite index from the JSONL source")
+    lookup = sub.add_parser("lookup", help="Show what a city name resolves to")
+    lookup.add_argument("name")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build(catalog.source, catalog.path)
+        print(f"Built {catalog.path} from {catalog.source}")
+    else:
+        city = catalog.city(args.name)
+        if city is None:
+            print(f"No catalog entry for {args.name!r}")
+            return
+        print(f"{args.name!r} -> {city['name']}, {city['country']} ({city['key']})")
+        for kind in KINDS:
+            print(f"  {kind}: {len(catalog.entries(args.name, kind))}")
+
+
+if __name__ == "__main__":
+    main()
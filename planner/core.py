@@ -0,0 +1,109 @@
+import contextvars
+import datetime
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, NamedTuple, Optional
+
+from . import metrics
+from .costs import cheapest_dates, daily_cost, estimate_total_cost
+from .search import get_attractions, search_hotels, search_transport
+
+
+class Event(NamedTuple):
+    section: str  # "transport", "hotels" or "attractions"
+    provider: Optional[str]  # "rome2rio", "booking", "google", "catalog"; None for "done"
+    kind: str  # "result", "fallback", "hedge", "skip", "error" or "done"
+    data: Any  # Provider options / reason / error message; the section's final result for "done"
+
+
+# Concurrent planning engine: all three sections fetch at once, each running its own
+# provider chain (see planner.scheduler). Yields an Event per provider result,
+# fallback and error as they happen, then one "done" per section, so a front end can show the
+# first useful result right away instead of waiting for the slowest provider.
+def plan_events(start, dest, date_start, date_end):
+    events = queue.Queue()
+    hotel_warnings = []
+
+    def emitter(section):
+        return lambda provider, kind, data: events.put(Event(section, provider, kind, data))
+
+    # Run each section in a copy of the caller's context so its timing spans land in the caller's trace
+    def submit(pool, fn, *args, **kwargs):
+        return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = {
+            "transport": submit(pool, search_transport, start, dest, date_start, date_end, emit=emitter("transport")),
+            "hotels": submit(pool, search_hotels, dest, date_start, date_end, hotel_warnings, emit=emitter("hotels")),
+            "attractions": submit(pool, get_attractions, dest, date_start, date_end, emit=emitter("attractions")),
+        }
+        for section, future in futures.items():
+            future.add_done_callback(lambda f, section=section: events.put(Event(section, None, "done", f)))
+        done = set()
+        while len(done) < len(futures):
+            event = events.get()
+            if event.section in done:
+                continue  # Late events from a background cache refresh
+            if event.kind == "done":
+                done.add(event.section)
+                result = event.data.result()
+                event = event._replace(data=(result, hotel_warnings) if event.section == "hotels" else result)
+            yield event
+
+
+# Just the final (section, result) pairs, in the order the sections finish
+def plan_sections(start, dest, date_start, date_end):
+    for event in plan_events(start, dest, date_start, date_end):
+        if event.kind == "done":
+            yield event.section, event.data
+
+
+# Plan a whole trip headlessly. Dates may be "YYYY-MM-DD" strings or datetime.date objects.
+# Returns plain data (picklable/JSON-friendly) so it can run in a process pool or background worker.
+def plan_trip(start, dest, date_start, date_end, travelers=2):
+    date_start, date_end = str(date_start), str(date_end)
+    with metrics.tracing(f"{start} -> {dest} {date_start}..{date_end}"):
+        results = dict(plan_sections(start, dest, date_start, date_end))
+    return build_plan(start, dest, date_start, date_end, travelers, results)
+
+
+FLEX_DAYS = 3  # Default spread for sweep_dates: start up to this many days earlier or later
+
+
+# Flexible dates: price the same trip length starting up to `spread` days either side of date_start
+# (never before today), cheapest first. Transport and hotels for each date are looked up concurrently
+# through the result cache, so repeat sweeps and prefetched routes are instant.
+def sweep_dates(start, dest, date_start, date_end, travelers=2, spread=FLEX_DAYS):
+    ds, de = datetime.date.fromisoformat(str(date_start)), datetime.date.fromisoformat(str(date_end))
+    shifts = [datetime.timedelta(days=n) for n in range(-spread, spread + 1) if ds + datetime.timedelta(days=n) >= datetime.date.today()]
+    dates = [((ds + shift).isoformat(), (de + shift).isoformat()) for shift in shifts]
+
+    def quote(dates):
+        return dates + (search_transport(start, dest, *dates), search_hotels(dest, *dates, []))
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        quotes = list(pool.map(lambda d: contextvars.copy_context().run(quote, d), dates))
+    return cheapest_dates(quotes, (de - ds).days + 1, travelers, daily_cost(dest))
+
+
+# Assemble the plan record from finished section results (as yielded by plan_sections)
+def build_plan(start, dest, date_start, date_end, travelers, results):
+    transports = results["transport"]
+    hotels, warnings = results["hotels"]
+    attractions, itinerary, days = results["attractions"]
+    trans_price, hotel_price, other_price, total = estimate_total_cost(transports, hotels, days, travelers, daily_cost(dest))
+    return {
+        "start": start,
+        "dest": dest,
+        "date_start": date_start,
+        "date_end": date_end,
+        "travelers": travelers,
+        "transports": transports,
+        "hotels": hotels,
+        "attractions": list(attractions),
+        "itinerary": itinerary,
+        "days": days,
+        "costs": {"transport": trans_price, "hotels": hotel_price, "other": other_price, "total": total},
+        "warnings": warnings,
+        "planned_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
@@ -0,0 +1,145 @@
+import numpy as np
+
+from .catalog import catalog
+from .prices import cost_of
+
+# Cost engine: every (transport option x hotel option x trip length x traveler count) combination is
+# priced at once with NumPy broadcasting, in prices.BASE_CURRENCY. Cheap enough to rerun on every
+# Streamlit rerun; the flexible-date sweep reuses the same arithmetic across shifted start dates.
+
+DEFAULT_ROUND_TRIP = 50  # Per person, when a transport price can't be read
+DEFAULT_NIGHT = 50  # Per room, when a hotel price can't be read
+DEFAULT_DAILY = 50  # Attractions, food etc. per person per day, for cities the catalog has no figure for
+RATING_WEIGHT = 0.03  # rank(): each hotel rating point (out of 10) above NEUTRAL_RATING counts as 3% off the total
+NEUTRAL_RATING = 7.0  # Unrated hotels are ranked as if rated this
+
+
+def _low(item, unit):
+    cost = cost_of(item, unit)
+    return cost.low if cost else np.nan
+
+
+# Usable options only: entries without a price ("No specific options found", errors) aren't choices
+def _priced(items):
+    return [item for item in items or [] if item.get('price') and item['price'] != "N/A"]
+
+
+# Per person round trip (the scraped fares are one-way); NaN where the price can't be read
+def _round_trips(transports):
+    return np.array([_low(item, "trip") for item in transports], dtype=float) * 2
+
+
+def _nightly(hotels):
+    return np.array([_low(item, "night") for item in hotels], dtype=float)
+
+
+# Unreadable prices ("Check site") never beat real ones: they cost inf while any price in the
+# section can be read, and the default only when none can
+def _readable(prices, default):
+    return np.where(np.isnan(prices), np.inf if np.isfinite(prices).any() else default, prices)
+
+
+# Out of 10: Booking.com rates 0-10, Google snippets mostly 0-5; NaN when missing
+def _ratings(hotels):
+    ratings = []
+    for item in hotels:
+        try:
+            rating = float(item.get('rating', ""))
+        except ValueError:
+            rating = np.nan
+        ratings.append(rating * 2 if rating <= 5 else rating)
+    return np.array(ratings, dtype=float)
+
+
+def _room_factor(travelers):
+    return np.maximum(1, travelers / 2)  # Rough: 1 room for 1-2, more for larger groups
+
+
+def daily_cost(dest):
+    city = catalog.city(dest)
+    return city["daily"] if city and city.get("daily") else DEFAULT_DAILY
+
+
+# Component arrays of shape (transports, hotels, lengths, travelers); `days` and `travelers` may be
+# scalars or sequences. A section with no usable options costs nothing (one all-zero "option").
+def cost_grid(transports, hotels, days, travelers, daily=DEFAULT_DAILY):
+    trans = _readable(_round_trips(transports), DEFAULT_ROUND_TRIP) if transports else np.zeros(1)
+    night = _readable(_nightly(hotels), DEFAULT_NIGHT) if hotels else np.zeros(1)
+    days = np.atleast_1d(np.asarray(days, dtype=float))
+    travelers = np.atleast_1d(np.asarray(travelers, dtype=float))
+    transport = trans[:, None, None, None] * travelers  # (T, 1, 1, P)
+    hotel = night[None, :, None, None] * days[:, None] * _room_factor(travelers)  # (1, H, D, P)
+    other = daily * days[:, None] * travelers  # (D, P)
+    shape = (len(trans), len(night), len(days), len(travelers))
+    return {
+        "transport": np.broadcast_to(transport, shape),
+        "hotels": np.broadcast_to(hotel, shape),
+        "other": np.broadcast_to(other, shape),
+        "total": transport + hotel + other,
+    }
+
+
+# Combinations best value first: by total cost adjusted for the hotel's rating (`rating_weight` per point away
+# from NEUTRAL_RATING; 0 ranks on cost alone), equal scores going to the better-rated hotel. Returns up to `limit` dicts.
+def rank(transports, hotels, days, travelers, limit=10, daily=DEFAULT_DAILY, rating_weight=RATING_WEIGHT):
+    transports, hotels = _priced(transports), _priced(hotels)
+    days, travelers = np.atleast_1d(days), np.atleast_1d(travelers)
+    grid = cost_grid(transports, hotels, days, travelers, daily)
+    total = grid["total"]
+    rating = _ratings(hotels) if hotels else np.full(1, np.nan)
+    rating = np.broadcast_to(rating[None, :, None, None], total.shape)
+    rated = np.nan_to_num(rating, nan=NEUTRAL_RATING)
+    score = total * (1 - rating_weight * (rated - NEUTRAL_RATING))
+    order = np.lexsort((-rated.ravel(), score.ravel()))
+    order = order[np.isfinite(score.ravel()[order])][:limit]  # Unreadable prices lose to real ones
+    ranked = []
+    for flat in order:
+        t, h, d, p = np.unravel_index(flat, total.shape)
+        ranked.append({
+            "transport": transports[t] if transports else None,
+            "hotel": hotels[h] if hotels else None,
+            "days": int(days[d]),
+            "travelers": int(travelers[p]),
+            "rating": None if np.isnan(rating[t, h, d, p]) else float(rating[t, h, d, p]),
+            "score": float(score[t, h, d, p]),
+            "costs": {name: float(grid[name][t, h, d, p]) for name in ("transport", "hotels", "other", "total")},
+        })
+    return ranked
+
+
+# Function to estimate total cost (rough calculation) for the cheapest combination, in prices.BASE_CURRENCY
+def estimate_total_cost(transports, hotels, days, travelers, daily=DEFAULT_DAILY):
+    costs = rank(transports, hotels, days, travelers, limit=1, daily=daily, rating_weight=0)[0]["costs"]
+    return costs["transport"], costs["hotels"], costs["other"], costs["total"]
+
+
+# Flexible dates: `quotes` is [(date_start, date_end, transports, hotels)] for shifted start dates of the
+# same trip length. Returns one entry per date, cheapest first, each priced with its cheapest options.
+def cheapest_dates(quotes, days, travelers, daily=DEFAULT_DAILY):
+    if not quotes:
+        return []
+    fares = [_round_trips(t) for t in (_priced(q[2]) for q in quotes)]
+    nights = [_nightly(h) for h in (_priced(q[3]) for q in quotes)]
+    # Pad to (dates, options) with inf so a date without options never looks cheapest
+    trans = np.full((len(quotes), max(1, max(map(len, fares)))), np.inf)
+    night = np.full((len(quotes), max(1, max(map(len, nights)))), np.inf)
+    for i, (f, n) in enumerate(zip(fares, nights)):
+        trans[i, :len(f)] = f
+        night[i, :len(n)] = n
+    trans, night = _readable(trans, DEFAULT_ROUND_TRIP), _readable(night, DEFAULT_NIGHT)  # Across all dates
+    # A section no date has options for costs nothing everywhere, as in estimate_total_cost
+    best_trans = trans.min(axis=1) if np.isfinite(trans).any() else np.zeros(len(quotes))
+    best_night = night.min(axis=1) if np.isfinite(night).any() else np.zeros(len(quotes))
+    transport = best_trans * travelers
+    hotel = best_night * days * _room_factor(travelers)
+    other = np.full(len(quotes), daily * days * travelers, dtype=float)
+    total = transport + hotel + other
+    return [
+        {
+            "date_start": quotes[i][0],
+            "date_end": quotes[i][1],
+            "costs": {"transport": float(transport[i]), "hotels": float(hotel[i]), "other": float(other[i]), "total": float(total[i])},
+        }
+        for i in np.argsort(total, kind="stable")
+        if np.isfinite(total[i])
+    ]
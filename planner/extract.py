@@ -0,0 +1,122 @@
+import os
+from functools import lru_cache
+
+# Pluggable HTML extraction for the scrapers. Picks the fastest parser installed
+# (selectolax, then lxml, then BeautifulSoup's html.parser), only looks at the repeated result
+# containers we care about, and evaluates each field selector once per item.
+
+# The repeated containers on each provider's page. `strainer` is what BeautifulSoup
+# parses (everything outside those subtrees is skipped), `css` is what the fast parsers select.
+SCOPES = {
+    "google": {"css": ".tF2Cxc", "strainer": {"class_": "tF2Cxc"}},
+    "booking": {"css": "div[data-testid=property-card]", "strainer": {"name": "div", "attrs": {"data-testid": "property-card"}}},
+    "rome2rio": {"css": ".route__details, .itinerary-item", "strainer": {"class_": ["route__details", "itinerary-item"]}},
+}
+
+# Fields pulled out of each container: name -> (css selector, attribute or None for the element's text)
+FIELDS = {
+    "google": {"title": ('h3', None), "snippet": ('.VwiC3b', None), "link": ('a', 'href')},
+    "booking": {
+        "name": ('div[data-testid=title]', None),
+        "price": ('span[data-testid=price-and-discounted-price]', None),
+        "rating": ('div[data-testid=review-score]', None),
+        "link": ('a[data-testid=title-link]', 'href'),
+    },
+    "rome2rio": {"mode": ('.route__title, .mode', None), "price": ('.route__price, .price', None), "link": ('a', 'href')},
+}
+
+
+def _pick_backend():
+    try:
+        import selectolax.lexbor  # noqa: F401
+        return "selectolax"
+    except ImportError:
+        pass
+    try:
+        import lxml.html  # noqa: F401
+        import cssselect  # noqa: F401
+        return "lxml"
+    except ImportError:
+        pass
+    return "html.parser"
+
+
+# "legacy" is the old full-tree BeautifulSoup parse, kept for benchmarking and as an escape hatch
+BACKENDS = ("selectolax", "lxml", "html.parser", "legacy")
+BACKEND = os.environ.get("VOYAGEAI_HTML_BACKEND") or _pick_backend()
+
+
+@lru_cache(maxsize=None)
+def _lxml_selector(css):
+    from cssselect import GenericTranslator
+    from lxml.cssselect import CSSSelector
+    return CSSSelector(css, translator=GenericTranslator())
+
+
+@lru_cache(maxsize=None)
+def _soupsieve_selector(css):
+    import soupsieve
+    return soupsieve.compile(css)
+
+
+def _extract_selectolax(html, scope, fields, limit):
+    from selectolax.lexbor import LexborHTMLParser
+    rows = []
+    for item in LexborHTMLParser(html).css(SCOPES[scope]["css"])[:limit]:
+        row = {}
+        for name, (css, attr) in fields.items():
+            node = item.css_first(css)
+            if node is None:
+                row[name] = None
+            else:
+                row[name] = node.attributes.get(attr) if attr else node.text().strip()
+        rows.append(row)
+    return rows
+
+
+def _extract_lxml(html, scope, fields, limit):
+    import lxml.html
+    rows = []
+    for item in _lxml_selector(SCOPES[scope]["css"])(lxml.html.fromstring(html))[:limit]:
+        row = {}
+        for name, (css, attr) in fields.items():
+            found = _lxml_selector(css)(item)
+            if not found:
+                row[name] = None
+            else:
+                row[name] = found[0].get(attr) if attr else found[0].text_content().strip()
+        rows.append(row)
+    return rows
+
+
+def _extract_bs4(html, scope, fields, limit, legacy=False):
+    from bs4 import BeautifulSoup, SoupStrainer
+    if legacy:
+        soup = BeautifulSoup(html, 'html.parser')
+        items = soup.select(SCOPES[scope]["css"])[:limit]
+    else:
+        soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer(**SCOPES[scope]["strainer"]))
+        items = _soupsieve_selector(SCOPES[scope]["css"]).select(soup)[:limit]
+    rows = []
+    for item in items:
+        row = {}
+        for name, (css, attr) in fields.items():
+            node = item.select_one(css) if legacy else _soupsieve_selector(css).select_one(item)
+            if node is None:
+                row[name] = None
+            else:
+                row[name] = node.get(attr) if attr else node.text.strip()
+        rows.append(row)
+    return rows
+
+
+# Pull one dict per `scope` container out of `html`, with one key per field (default FIELDS[scope]).
+# Missing elements come back as None.
+def extract(html, scope, fields=None, limit=None, backend=None):
+    fields = fields or FIELDS[scope]
+    backend = backend or BACKEND
+    if backend == "selectolax":
+        return _extract_selectolax(html, scope, fields, limit)
+    if backend == "lxml":
+        return _extract_lxml(html, scope, fields, limit)
+    return _extract_bs4(html, scope, fields, limit, legacy=backend == "legacy")
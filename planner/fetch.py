@@ -0,0 +1,148 @@
+import contextvars
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Shared HTTP client for every scrape: one pooled keep-alive session, hard timeouts,
+# bounded retries, and per-host concurrency + rate limits so a slow provider can't pile up workers.
+
+USER_AGENT = 'Mozilla/5.0'
+TIMEOUT = (3.05, 10)  # (connect, read) seconds
+RETRIES = dict(  # urllib3 Retry settings; requests/urllib3 are only imported when the first request goes out
+    total=2,
+    backoff_factor=0.5,  # 0.5s, 1s between attempts
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=("GET",),
+    respect_retry_after_header=True,  # Capped at the call's read timeout; every retry also waits for a host token
+    raise_on_status=False,  # Hand back the last response instead of raising; the scrapers fall back on thin pages anyway
+)
+
+# Per-host limits: max requests in flight, and a token bucket of `rate` requests/second with `burst` capacity
+HOST_LIMITS = {
+    "google.com": {"concurrency": 2, "rate": 1.0, "burst": 3},
+    "booking.com": {"concurrency": 4, "rate": 2.0, "burst": 4},
+    "rome2rio.com": {"concurrency": 4, "rate": 2.0, "burst": 4},
+}
+DEFAULT_LIMIT = {"concurrency": 8, "rate": 5.0, "burst": 10}
+
+# hostname -> base URL to send its requests to instead, e.g. {"www.google.com": "http://127.0.0.1:8001"}.
+# Used by the offline benchmarks to point the scrapers at local stub servers.
+HOST_OVERRIDES = {}
+
+# Extra TokenBucket every request made in the current context is charged to; set by background jobs
+# (see planner.prefetch) so their traffic stays within a global budget. Requests never wait on it: the job
+# waits between lookups instead, so budget waits aren't timed as provider latency or held inside a lookup.
+budget = contextvars.ContextVar("voyageai_fetch_budget", default=None)
+
+# (host token bucket, longest Retry-After to honour) for the request going out on this thread; read by the
+# retry policy, which urllib3 runs inside session.get()
+_retrying = contextvars.ContextVar("voyageai_fetch_retrying", default=None)
+
+# urllib3 decodes brotli transparently when a brotli package is installed; only advertise it then
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    # Block until a token is available; take it unless `take` is False
+    def acquire(self, take=True):
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    if take:
+                        self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    # Take a token without waiting; the bucket may go into debt, which later acquire() calls wait out
+    def charge(self):
+        with self._lock:
+            self._refill()
+            self.tokens -= 1
+
+
+_session = None
+_limiters = {}  # host key -> (semaphore, token bucket)
+_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+    with _lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            # A server's Retry-After can't stretch a call past its own timeout, and retries pass the host's rate limit
+            class LimitedRetry(Retry):
+                def get_retry_after(self, response):
+                    seconds = super().get_retry_after(response)
+                    limits = _retrying.get()
+                    return seconds if seconds is None or limits is None else min(seconds, limits[1])
+
+                def sleep(self, response=None):
+                    super().sleep(response)
+                    limits = _retrying.get()
+                    if limits is not None:
+                        limits[0].acquire()
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=LimitedRetry(**RETRIES))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({'User-Agent': USER_AGENT, 'Accept-Encoding': ACCEPT_ENCODING})
+            _session = session
+        return _session
+
+
+def _limiter(host):
+    key = next((h for h in HOST_LIMITS if host == h or host.endswith("." + h)), host)
+    with _lock:
+        if key not in _limiters:
+            limit = HOST_LIMITS.get(key, DEFAULT_LIMIT)
+            _limiters[key] = (threading.BoundedSemaphore(limit["concurrency"]), TokenBucket(limit["rate"], limit["burst"]))
+        return _limiters[key]
+
+
+# GET through the shared session, respecting the host's limits. `encoding` overrides the detected charset.
+def get(url, encoding=None, timeout=TIMEOUT, **kwargs):
+    parts = urlsplit(url)
+    semaphore, bucket = _limiter(parts.hostname or "")
+    extra = budget.get()
+    if extra is not None:
+        extra.charge()
+    if parts.hostname in HOST_OVERRIDES:
+        url = HOST_OVERRIDES[parts.hostname] + parts.path + ("?" + parts.query if parts.query else "")
+    read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+    with semaphore:
+        bucket.acquire()
+        token = _retrying.set((bucket, read_timeout if read_timeout is not None else TIMEOUT[1]))
+        try:
+            response = get_session().get(url, timeout=timeout, **kwargs)
+        finally:
+            _retrying.reset(token)
+    if encoding:
+        response.encoding = encoding
+    return response
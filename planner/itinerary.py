@@ -0,0 +1,40 @@
+# Day-by-day plan: every attraction is visited once and in order, instead of repeating the list the
+# way `attractions[i % len]` used to. When they fit in the middle days they are spread out evenly,
+# leaving free days between; otherwise they are grouped, with the biggest groups on middle days,
+# then the arrival day, and the departure day kept lightest.
+
+
+# Days in the order they get attractions: middle days, then arrival, then departure
+def _fill_order(days):
+    if days <= 2:
+        return list(range(days))
+    return list(range(1, days - 1)) + [0, days - 1]
+
+
+# Number of attractions per day
+def _day_loads(count, days):
+    loads = [0] * days
+    if not count:
+        return loads
+    if days > 2 and count <= days - 2:
+        step = (days - 3) / (count - 1) if count > 1 else 0
+        for i in range(count):
+            loads[round(1 + i * step)] = 1
+        return loads
+    active = _fill_order(days)[:min(days, count)]
+    size, extra = divmod(count, len(active))
+    for i, day in enumerate(active):
+        loads[day] = size + (i < extra)
+    return loads
+
+
+def build_itinerary(attractions, days):
+    days = max(1, days)
+    lines = []
+    visited = 0
+    for i, load in enumerate(_day_loads(len(attractions), days)):
+        group = attractions[visited:visited + load]
+        visited += load
+        todo = "Visit " + " and ".join(group) if group else "Free day to explore"
+        lines.append(f"Day {i+1}: {todo}. Enjoy local cuisine and relax!")
+    return "\n".join(lines)
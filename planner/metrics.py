@@ -0,0 +1,188 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Per-stage latency instrumentation. Every fetch / parse / fallback / sort in the scrapers runs
+# inside span(); spans feed process-wide histograms and counters (exported as Prometheus text)
+# and, while a plan is being traced, that plan's timing waterfall (optionally appended to a JSONL file).
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SECTIONS = ("transport", "hotels", "attractions")
+TRACE_PATH = os.environ.get("VOYAGEAI_TRACE_PATH")  # Append one JSON line per traced plan when set
+
+_current = contextvars.ContextVar("voyageai_trace", default=None)
+_lock = threading.Lock()
+_histograms = {}  # (stage, provider) -> [bucket counts..., sum, count]
+_counters = {}  # (name, sorted label items) -> value
+_server = None
+last_trace = None  # Most recent finished trace in this process
+
+
+class Trace:
+    def __init__(self, label=""):
+        self.label = label
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.spans.append(record)
+
+    def to_dict(self):
+        return {
+            "label": self.label,
+            "started_at": self.started_at,
+            "duration_ms": max((s["end_ms"] for s in self.spans), default=0.0),
+            "spans": sorted(self.spans, key=lambda s: s["start_ms"]),
+        }
+
+
+def count(name, value=1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(stage, provider, seconds):
+    with _lock:
+        row = _histograms.setdefault((stage, provider or ""), [0] * (len(BUCKETS) + 2))
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                row[i] += 1
+        row[-2] += seconds
+        row[-1] += 1
+
+
+# Time a stage. The yielded dict can be marked failed (record["ok"] = False, record["error"] = ...)
+# for outcomes that aren't exceptions, like an HTTP 503; exceptions mark it failed automatically.
+@contextmanager
+def span(stage, provider=None, section=None):
+    record = {"stage": stage, "provider": provider, "section": section, "ok": True}
+    start = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record["ok"] = False
+        record["error"] = str(e)
+        raise
+    finally:
+        end = time.perf_counter()
+        observe(stage, provider, end - start)
+        if stage == "fetch":
+            count("provider_requests_total", provider=provider or "", outcome="ok" if record["ok"] else "error")
+        trace = _current.get()
+        if trace is not None:
+            record["start_ms"] = (start - trace.started) * 1000
+            record["end_ms"] = (end - trace.started) * 1000
+            trace.add(record)
+
+
+# Trace everything run inside the block (including threads started with copy_context(), see planner.core)
+@contextmanager
+def tracing(label=""):
+    global last_trace
+    trace = Trace(label)
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+        count("plans_total")
+        last_trace = trace
+        if TRACE_PATH:
+            with _lock, open(TRACE_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(trace.to_dict(), ensure_ascii=False) + "\n")
+
+
+def _counter_sum(name, **match):
+    with _lock:
+        return sum(v for (n, labels), v in _counters.items() if n == name and all(dict(labels).get(k) == x for k, x in match.items()))
+
+
+# Derived rates for dashboards and the developer panel
+def snapshot():
+    from . import scheduler
+
+    sections = {}
+    for section in SECTIONS:
+        lookups = _counter_sum("section_lookups_total", section=section)
+        sections[section] = {
+            "lookups": lookups,
+            "fallback_rate": _counter_sum("section_fallbacks_total", section=section) / lookups if lookups else 0.0,
+        }
+    providers = {}
+    with _lock:
+        names = {dict(labels)["provider"] for n, labels in _counters if n == "provider_requests_total"}
+    for provider in sorted(names):
+        total = _counter_sum("provider_requests_total", provider=provider)
+        providers[provider] = {"requests": total, "failure_rate": _counter_sum("provider_requests_total", provider=provider, outcome="error") / total}
+    return {"sections": sections, "providers": providers, "health": scheduler.health()}
+
+
+def _labels(items):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}" if items else ""
+
+
+def render_prometheus():
+    from .cache import result_cache
+
+    lines = ["# TYPE voyageai_stage_seconds histogram"]
+    with _lock:
+        histograms = {k: list(v) for k, v in _histograms.items()}
+        counters = dict(_counters)
+    for (stage, provider), row in sorted(histograms.items()):
+        labels = [("stage", stage), ("provider", provider)]
+        for bound, n in zip(BUCKETS, row):
+            lines.append(f"voyageai_stage_seconds_bucket{_labels(labels + [('le', bound)])} {n}")
+        lines.append(f"voyageai_stage_seconds_bucket{_labels(labels + [('le', '+Inf')])} {row[-1]}")
+        lines.append(f"voyageai_stage_seconds_sum{_labels(labels)} {row[-2]:.6f}")
+        lines.append(f"voyageai_stage_seconds_count{_labels(labels)} {row[-1]}")
+    for name in sorted({n for n, _ in counters}):
+        lines.append(f"# TYPE voyageai_{name} counter")
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"voyageai_{name}{_labels(labels)} {value}")
+    lines.append("# TYPE voyageai_cache_requests_total counter")
+    for provider, stats in sorted(result_cache.stats.items()):
+        for outcome, value in stats.items():
+            lines.append(f"voyageai_cache_requests_total{_labels([('provider', provider), ('outcome', outcome)])} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# Serve /metrics (Prometheus text) and /metrics.json (snapshot + last trace) from a daemon thread.
+# Safe to call on every Streamlit rerun; only the first call starts a server.
+def start_server(port, host="127.0.0.1"):
+    global _server
+    with _lock:
+        if _server is not None:
+            return _server
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, kind = render_prometheus().encode(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    data = dict(snapshot(), last_trace=last_trace.to_dict() if last_trace else None)
+                    body, kind = json.dumps(data).encode(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", kind)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        _server = ThreadingHTTPServer((host, port), Handler)
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+        return _server
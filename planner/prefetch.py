@@ -0,0 +1,213 @@
+import argparse
+import contextvars
+import datetime
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from . import fetch, metrics
+from .cache import normalize_place, result_cache
+from .search import get_attractions, search_hotels, search_transport
+
+# Cache warming: keeps the result cache fresh for the routes people actually plan, so the first
+# load of a common trip is a cache hit. Routes come from a configured list plus the top-N seen in
+# the query log (start, dest, days until departure, nights). Entries are refreshed once they are
+# REFRESH_AT of the way to their TTL, and all prefetch traffic shares one outbound request budget.
+#   python -m planner.prefetch --once            # one pass, e.g. from cron
+#   VOYAGEAI_PREFETCH=1 streamlit run VoyageAI.py  # background thread inside the app
+# The app only logs plan requests when VOYAGEAI_PREFETCH is set, or VOYAGEAI_QUERY_LOG names a log
+# for a separately run prefetcher. Each pass drops log entries older than LEARN_DAYS.
+
+QUERY_LOG = os.environ.get(
+    "VOYAGEAI_QUERY_LOG",
+    os.path.join(os.path.expanduser("~"), ".cache", "voyageai", "queries.jsonl"),
+)
+LOG_QUERIES = bool(os.environ.get("VOYAGEAI_PREFETCH") or os.environ.get("VOYAGEAI_QUERY_LOG"))
+LEARN_DAYS = 14  # Only log entries this recent count towards popularity
+TOP_N = 20
+REFRESH_AT = 0.75  # Fraction of the TTL after which an entry is refreshed ahead of expiry
+INTERVAL = 60  # Seconds between passes in the background loop
+BUDGET_PER_HOUR = 120  # Outbound requests per hour for all prefetching together
+BUDGET_BURST = 10
+
+# Our busiest routes, at the app's default dates (a week out, for a week)
+POPULAR_ROUTES = [
+    {"start": start, "dest": dest, "offset": 7, "nights": 7}
+    for start in ("Pattaya", "Bangkok")
+    for dest in ("Chiang Mai", "Phuket", "Kuala Lumpur", "Singapore")
+]
+
+log = logging.getLogger(__name__)
+_log_lock = threading.Lock()
+_prefetcher = None
+
+
+def _route_key(route):
+    return (normalize_place(route["start"]), normalize_place(route["dest"]), int(route["offset"]), int(route["nights"]))
+
+
+# Append one planned trip to the query log (called by the front end for each plan request, if LOG_QUERIES)
+def record(start, dest, date_start, date_end, path=None):
+    path = QUERY_LOG if path is None else path
+    if not LOG_QUERIES or not path:
+        return
+    ds, de = datetime.date.fromisoformat(str(date_start)), datetime.date.fromisoformat(str(date_end))
+    line = {"at": time.time(), "start": start, "dest": dest, "offset": (ds - datetime.date.today()).days, "nights": (de - ds).days}
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with _log_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+    except OSError:
+        pass  # Logging demand must never break planning
+
+
+# The top_n most requested routes in the last LEARN_DAYS of the log, most popular first.
+# Older entries are dropped from the file, so it only ever holds LEARN_DAYS of traffic.
+def learn(path=None, top_n=TOP_N):
+    path = QUERY_LOG if path is None else path
+    if not path or not os.path.exists(path):
+        return []
+    since = time.time() - LEARN_DAYS * 86400
+    counts = Counter()
+    latest = {}  # key -> most recent spelling
+    kept = []
+    with _log_lock:
+        with open(path, encoding="utf-8") as f:
+            lines = f.readlines()
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Half-written line
+            if entry.get("at", 0) < since:
+                continue
+            kept.append(line if line.endswith("\n") else line + "\n")
+            if entry.get("offset", -1) < 0:
+                continue
+            key = _route_key(entry)
+            counts[key] += 1
+            latest[key] = entry
+        if len(kept) < len(lines):
+            tmp = f"{path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.writelines(kept)
+                os.replace(tmp, path)
+            except OSError:
+                pass  # Read-only log: still learn from it
+    return [{k: latest[key][k] for k in ("start", "dest", "offset", "nights")} for key, _ in counts.most_common(top_n)]
+
+
+def read_routes(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class Prefetcher:
+    def __init__(self, routes=None, top_n=TOP_N, log_path=None, budget_per_hour=BUDGET_PER_HOUR):
+        self.routes = POPULAR_ROUTES if routes is None else routes
+        self.top_n = top_n
+        self.log_path = log_path
+        self.budget = fetch.TokenBucket(budget_per_hour / 3600, BUDGET_BURST)
+        self.stats = {"passes": 0, "refreshed": 0, "failed": 0}
+        self._thread = None
+
+    # Configured routes first, then learned ones, without duplicates
+    def targets(self):
+        seen, routes = set(), []
+        for route in list(self.routes) + learn(self.log_path, self.top_n):
+            key = _route_key(route)
+            if key not in seen:
+                seen.add(key)
+                routes.append(route)
+        return routes
+
+    # Lookups whose cache entry is missing or due, most urgent first: (urgency, section, helper, args)
+    def due(self, today=None):
+        today = today or datetime.date.today()
+        jobs = {}
+        for route in self.targets():
+            ds = today + datetime.timedelta(days=int(route["offset"]))
+            dates = (ds.isoformat(), (ds + datetime.timedelta(days=int(route["nights"]))).isoformat())
+            for section, helper, args in (
+                ("transport", search_transport, (route["start"], route["dest"]) + dates),
+                ("hotels", search_hotels, (route["dest"],) + dates),
+                ("attractions", get_attractions, (route["dest"],) + dates),
+            ):
+                key = helper.key(*args)
+                if key in jobs:
+                    continue  # Hotels/attractions are shared by every start city
+                age = result_cache.age(key)
+                urgency = float("inf") if age is None else age / result_cache.ttls[section]
+                if urgency >= REFRESH_AT:
+                    jobs[key] = (urgency, section, helper, args)
+        return sorted(jobs.values(), key=lambda job: -job[0])
+
+    def _run(self):
+        fetch.budget.set(self.budget)  # Charged per request, so a lookup's extra requests come out of later waits
+        for _, section, helper, args in self.due():
+            self.budget.acquire(take=False)  # Wait here, outside the lookup, until the budget allows another
+            try:
+                helper.refresh(*args)
+                self.stats["refreshed"] += 1
+                metrics.count("prefetch_refreshes_total", section=section, outcome="ok")
+            except Exception:
+                self.stats["failed"] += 1
+                metrics.count("prefetch_refreshes_total", section=section, outcome="error")
+        self.stats["passes"] += 1
+        return self.stats
+
+    # One pass over everything that is due; blocks on the budget when it runs dry
+    def run_once(self):
+        return contextvars.copy_context().run(self._run)
+
+    def start(self, interval=INTERVAL):
+        def loop():
+            while True:
+                try:
+                    self.run_once()
+                except Exception:
+                    log.exception("Prefetch pass failed")
+                time.sleep(interval)
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=loop, daemon=True, name="voyageai-prefetch")
+            self._thread.start()
+        return self
+
+
+# Process-wide background prefetcher; safe to call on every Streamlit rerun
+def start(**kwargs):
+    global _prefetcher
+    with _log_lock:
+        if _prefetcher is None:
+            _prefetcher = Prefetcher(**kwargs).start()
+        return _prefetcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep the result cache warm for popular routes")
+    parser.add_argument("--routes", help="JSONL file of {start, dest, offset, nights} to use instead of the built-in list")
+    parser.add_argument("--top", type=int, default=TOP_N, help="How many learned routes from the query log to add")
+    parser.add_argument("--budget", type=int, default=BUDGET_PER_HOUR, help="Outbound requests per hour")
+    parser.add_argument("--interval", type=int, default=INTERVAL, help="Seconds between passes")
+    parser.add_argument("--once", action="store_true", help="Run a single pass and exit")
+    args = parser.parse_args()
+
+    prefetcher = Prefetcher(read_routes(args.routes) if args.routes else None, args.top, budget_per_hour=args.budget)
+    while True:
+        started = time.perf_counter()
+        stats = prefetcher.run_once()
+        print(f"Pass {stats['passes']}: {stats['refreshed']} refreshed, {stats['failed']} failed so far "
+              f"({time.perf_counter() - started:.1f}s)", file=sys.stderr)
+        if args.once:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
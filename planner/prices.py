@@ -0,0 +1,93 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+# Structured prices: scraped strings like "~฿3,000/night", "~$10 + $50-100 (total ~$60-110)" or "¥20,000"
+# are parsed once, at scrape time, into a Price and converted to BASE_CURRENCY so sorting and costing
+# compare numbers directly instead of re-parsing strings.
+
+BASE_CURRENCY = "USD"
+# Offline conversion table: BASE_CURRENCY per one unit of each currency (rough mid-market rates; update as needed)
+RATES = {
+    "USD": 1.0,
+    "EUR": 1.08,
+    "GBP": 1.27,
+    "THB": 0.028,
+    "JPY": 0.0067,
+    "MYR": 0.21,
+    "SGD": 0.74,
+}
+
+
+class Price(NamedTuple):
+    low: float
+    high: float
+    currency: str
+    unit: str  # "trip" (per person), "night", or "stay" (whole booking)
+
+
+# Longer symbols first so "US$"/"S$" win over "$"
+_CURRENCY = re.compile(r'US\$|S\$|\bRM|฿|€|£|¥|\$|\b(?:USD|EUR|GBP|THB|JPY|MYR|SGD)\b')
+_SYMBOLS = {"US$": "USD", "S$": "SGD", "RM": "MYR", "฿": "THB", "€": "EUR", "£": "GBP", "¥": "JPY", "$": "USD"}
+_NUMBER = re.compile(r'\d[\d,]*(?:\.\d+)?')
+_TOTAL = re.compile(r'\btotal\b(.*)', re.IGNORECASE)
+_NIGHT = re.compile(r'/\s*night|per night|a night|nightly', re.IGNORECASE)
+
+
+# Parse a price string into a Price in its own currency, or None when it has no number in it.
+# Ranges keep both ends, "a + b" parts are added up, and an explicit "(total ...)" wins over the parts.
+@lru_cache(maxsize=4096)
+def parse_price(text, unit="trip"):
+    if not text:
+        return None
+    currency = _CURRENCY.search(text)
+    currency = _SYMBOLS.get(currency.group(0), currency.group(0)) if currency else BASE_CURRENCY
+    total = _TOTAL.search(text)
+    body = total.group(1) if total and _NUMBER.search(total.group(1)) else text
+    low = high = 0.0
+    found = False
+    for part in body.split("+"):
+        numbers = [float(n.replace(",", "")) for n in _NUMBER.findall(part)[:2]]
+        if numbers:
+            found = True
+            low += numbers[0]
+            high += max(numbers)
+    if not found:
+        return None
+    return Price(low, high, currency, "night" if _NIGHT.search(text) else unit)
+
+
+def to_base(price):
+    if price is None or price.currency == BASE_CURRENCY:
+        return price
+    rate = RATES.get(price.currency)
+    if rate is None:
+        return None
+    return Price(price.low * rate, price.high * rate, BASE_CURRENCY, price.unit)
+
+
+# Whole-stay prices (Booking.com quotes the total for the dates) become per-night
+def per_night(price, nights):
+    if price is None or price.unit != "stay":
+        return price
+    nights = max(1, nights)
+    return Price(price.low / nights, price.high / nights, price.currency, "night")
+
+
+# What the scrapers store on each option as "cost"
+def normalize_price(text, unit="trip", nights=1):
+    return per_night(to_base(parse_price(text, unit)), nights)
+
+
+# An option's cost as a Price: stored at scrape time (JSON round-trips turn it into a list),
+# or parsed now for entries that never went through a scraper
+def cost_of(item, unit="trip"):
+    if "cost" not in item:
+        return normalize_price(item.get("price") or "", unit)
+    cost = item["cost"]
+    return Price(*cost) if isinstance(cost, list) else cost
+
+
+def sort_key(item):
+    cost = cost_of(item)
+    return cost.low if cost else float('inf')
@@ -0,0 +1,194 @@
+import datetime
+import re
+from typing import NamedTuple
+from urllib.parse import quote
+
+from . import extract, fetch, metrics
+from .catalog import catalog
+from .prices import normalize_price
+
+# Provider plugins: each one answers a single section ("transport", "hotels" or "attractions") for a
+# Query and returns a list of options. Subclass Provider and decorate it with @register to add one;
+# planner.scheduler decides the order they're tried in, hedges slow ones and skips failing ones.
+
+# Snippet patterns for the Google providers, compiled once
+TRANSPORT_PRICE = re.compile(r'\$?\d+[\d,.]*')
+HOTEL_PRICE = re.compile(r'\$?\d+[\d,.]*|฿\d+[\d,.]*|€\d+[\d,.]*|¥\d+[\d,.]*')  # Handle USD, THB, EUR, JPY
+DURATION = re.compile(r'\d+ ?(h|hour|min)')
+RATING = re.compile(r'\d\.\d')
+
+REGISTRY = {}  # section -> providers, in registration order
+
+
+class Query(NamedTuple):
+    start: str
+    dest: str
+    date_start: str
+    date_end: str
+
+
+# Raised for provider answers that aren't usable at all (e.g. HTTP 503), so they count as failures
+class ProviderError(Exception):
+    pass
+
+
+class Provider:
+    name = ""  # Short id used in events, metrics and stats ("rome2rio", "google", ...)
+    label = ""  # Human-readable name for notes and warnings
+    section = ""
+    local = False  # Local providers (the catalog) are cheap and reliable: always tried last, never hedged or skipped
+
+    def search(self, query):
+        raise NotImplementedError
+
+
+def register(cls):
+    REGISTRY.setdefault(cls.section, []).append(cls())
+    return cls
+
+
+def providers(section):
+    return list(REGISTRY.get(section, []))
+
+
+def google_url(query):
+    return f"https://www.google.com/search?q={quote(query)}"
+
+
+def _nights(date_start, date_end):
+    return (datetime.date.fromisoformat(date_end) - datetime.date.fromisoformat(date_start)).days
+
+
+# Fetch and parse one provider page inside timing spans (see planner.metrics)
+def _fetch(url, provider, section, encoding=None):
+    with metrics.span("fetch", provider, section) as record:
+        response = fetch.get(url, encoding=encoding)
+        if response.status_code >= 400:
+            record["ok"] = False
+            record["error"] = f"HTTP {response.status_code}"
+    if response.status_code >= 400:
+        raise ProviderError(f"HTTP {response.status_code}")
+    return response
+
+
+def _extract(html, scope, section, limit=None):
+    with metrics.span("parse", scope, section):
+        return extract.extract(html, scope, limit=limit)
+
+
+@register
+class Rome2RioTransport(Provider):
+    name, label, section = "rome2rio", "Rome2Rio", "transport"
+
+    def search(self, query):
+        url = f"https://www.rome2rio.com/search/{query.start}/{query.dest}?departureDate={query.date_start}"
+        response = _fetch(url, self.name, self.section)
+        options = []
+        for item in _extract(response.text, "rome2rio", self.section):
+            if not item['price']:
+                continue  # Routes without a price are junk for planning
+            link = item['link'] or "/"
+            full_link = f"https://www.rome2rio.com{link}" if link.startswith('/') else link  # Ensure full URL
+            options.append({"mode": item['mode'] or "Unknown", "price": item['price'], "link": full_link, "cost": normalize_price(item['price'])})
+        return options
+
+
+@register
+class GoogleTransport(Provider):
+    name, label, section = "google", "Google", "transport"
+
+    def search(self, query):
+        url = google_url(f"cheap flights or transport from {query.start} to {query.dest} on {query.date_start} prices")  # Tweaked query for better international hits
+        response = _fetch(url, self.name, self.section)
+        options = []
+        for result in _extract(response.text, "google", self.section, limit=5):  # Up to 5 for better coverage
+            title = result['title'] or "Option"
+            snippet = result['snippet'] or ""
+            price_match = TRANSPORT_PRICE.search(snippet)
+            price = price_match.group(0) if price_match else "~$20-40 (estimated)"
+            duration_match = DURATION.search(snippet)
+            duration = duration_match.group(0) if duration_match else "~5-10h"
+            options.append({"mode": f"{title} ({duration})", "price": price, "link": result['link'] or url, "cost": normalize_price(price)})
+        return options
+
+
+@register
+class CatalogTransport(Provider):
+    name, label, section, local = "catalog", "Catalog", "transport", True
+
+    def search(self, query):
+        with metrics.span("fallback", self.name, self.section):
+            known = catalog.transports(query.dest)
+            for opt in known:
+                opt["cost"] = normalize_price(opt["price"])
+        return known
+
+
+@register
+class BookingHotels(Provider):
+    name, label, section = "booking", "Booking.com", "hotels"
+
+    def search(self, query):
+        url = f"https://www.booking.com/searchresults.html?ss={query.dest}&checkin={query.date_start}&checkout={query.date_end}&group_adults=2&no_rooms=1&order=price"
+        response = _fetch(url, self.name, self.section, encoding='utf-8')  # Force UTF-8 to handle characters
+        nights = _nights(query.date_start, query.date_end)
+        hotels = []
+        for item in _extract(response.text, "booking", self.section):
+            rating = (item['rating'] or "").split()
+            price = item['price'] or "Price N/A"
+            hotels.append({
+                "name": item['name'] or "Unknown Hotel",
+                "price": price,
+                "rating": rating[0] if rating else "Rating N/A",
+                "link": item['link'] or "https://www.booking.com",
+                "cost": normalize_price(price, "stay", nights),  # Booking.com quotes the whole stay
+            })
+        return hotels
+
+
+@register
+class GoogleHotels(Provider):
+    name, label, section = "google", "Google", "hotels"
+
+    def search(self, query):
+        url = google_url(f"best hotels in {query.dest} {query.date_start} to {query.date_end} prices ratings")
+        response = _fetch(url, self.name, self.section, encoding='utf-8')
+        hotels = []
+        for result in _extract(response.text, "google", self.section, limit=5):  # More results for reliability
+            snippet = result['snippet'] or ""
+            price_match = HOTEL_PRICE.search(snippet)
+            price = price_match.group(0) if price_match else "Check site"
+            rating_match = RATING.search(snippet)
+            rating = rating_match.group(0) if rating_match else "N/A"
+            hotels.append({"name": result['title'] or "Hotel", "price": price, "rating": rating, "link": result['link'] or url, "cost": normalize_price(price, "night")})
+        return hotels
+
+
+@register
+class CatalogHotels(Provider):
+    name, label, section, local = "catalog", "Catalog", "hotels", True
+
+    def search(self, query):
+        with metrics.span("fallback", self.name, self.section):
+            known = catalog.hotels(query.dest)
+            for hotel in known:
+                hotel["cost"] = normalize_price(hotel["price"], "night")
+        return known
+
+
+@register
+class GoogleAttractions(Provider):
+    name, label, section = "google", "Google", "attractions"
+
+    def search(self, query):
+        response = _fetch(google_url(f"top attractions in {query.dest} things to do"), self.name, self.section, encoding='utf-8')
+        return [result['title'] for result in _extract(response.text, "google", self.section, limit=5) if result['title']]
+
+
+@register
+class CatalogAttractions(Provider):
+    name, label, section, local = "catalog", "Catalog", "attractions", True
+
+    def search(self, query):
+        with metrics.span("fallback", self.name, self.section):
+            return catalog.attractions(query.dest)
@@ -0,0 +1,201 @@
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from . import fetch, metrics
+from .providers import providers
+
+# Provider scheduling: every registered provider keeps a rolling window of outcomes and latencies.
+# gather() tries the network providers best-first, starts the next one early (a hedge) when the
+# current one runs past its usual p90 latency, skips providers whose circuit breaker is open, and
+# returns as soon as enough results are in. Local providers (the catalog) only run when that isn't enough.
+# Lookups on a request budget (prefetching) don't hedge: they aren't waited on, and hedges spend the budget twice.
+
+WINDOW = 50  # Outcomes remembered per provider
+MIN_SAMPLES = 5  # Below this, latency percentiles fall back to HEDGE_AFTER
+HEDGE_AFTER = 2.5  # Seconds before hedging a provider we know nothing about yet
+FAILURES_TO_OPEN = 3  # Consecutive failures that open the circuit
+COOLDOWN = 60.0  # Seconds an open circuit waits before letting one trial request through
+
+
+class ProviderStats:
+    def __init__(self):
+        self.samples = deque(maxlen=WINDOW)  # (ok, share of the needed results it delivered, seconds)
+        self.failures = 0  # Consecutive
+        self.opened_at = None
+        self.trial = False  # Half-open: one request is probing the provider
+        self._lock = threading.Lock()
+
+    def record(self, ok, good, seconds):
+        with self._lock:
+            self.samples.append((ok, good, seconds))
+            self.failures = 0 if ok else self.failures + 1
+            if ok:
+                self.opened_at = None
+            elif self.failures >= FAILURES_TO_OPEN:
+                self.opened_at = time.monotonic()  # (Re)open, also when a half-open trial fails
+            self.trial = False
+
+    # Circuit breaker: closed lets everything through, open nothing, half-open a single trial
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if not self.trial and time.monotonic() - self.opened_at >= COOLDOWN:
+                self.trial = True
+                return True
+            return False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self.trial or time.monotonic() - self.opened_at >= COOLDOWN else "open"
+
+    # Average share of the needed results delivered per call; unknown providers get the benefit of the doubt
+    def success_rate(self):
+        with self._lock:
+            samples = list(self.samples)
+        return sum(good for _, good, _ in samples) / len(samples) if samples else 1.0
+
+    def latency(self, quantile):
+        with self._lock:
+            times = sorted(seconds for ok, _, seconds in self.samples if ok)
+        if len(times) < MIN_SAMPLES:
+            return HEDGE_AFTER
+        return times[int(quantile * (len(times) - 1))]
+
+
+_stats = {}  # (section, provider name) -> ProviderStats
+_stats_lock = threading.Lock()
+
+
+def stats_for(section, name):
+    with _stats_lock:
+        return _stats.setdefault((section, name), ProviderStats())
+
+
+# Network providers best-first: higher success rate (to one decimal), then lower median latency;
+# ties keep registration order
+def ordered(section):
+    remote = [p for p in providers(section) if not p.local]
+    return sorted(remote, key=lambda p: (-round(stats_for(section, p.name).success_rate(), 1), stats_for(section, p.name).latency(0.5)))
+
+
+# Per-provider view for the developer panel and /metrics.json
+def health():
+    with _stats_lock:
+        items = sorted(_stats.items())
+    return {
+        f"{section}/{name}": {
+            "state": stats.state,
+            "success_rate": round(stats.success_rate(), 3),
+            "p50_s": round(stats.latency(0.5), 3),
+            "p90_s": round(stats.latency(0.9), 3),
+            "samples": len(stats.samples),
+        }
+        for (section, name), stats in items
+    }
+
+
+# Runs in a pool thread; records the outcome even when gather() has already returned without it
+def _call(provider, query, need):
+    stats = stats_for(provider.section, provider.name)
+    started = time.perf_counter()
+    try:
+        items = provider.search(query)
+    except Exception:
+        stats.record(False, 0.0, time.perf_counter() - started)
+        raise
+    stats.record(True, min(len(items), need) / need, time.perf_counter() - started)
+    return items
+
+
+# Collect results for one section until `need` of them are in. Calls emit(provider, kind, data) with
+# kind "result", "fallback", "hedge", "skip" or "error" as it goes. Returns ([(provider name, items)], [(provider, error)])
+# in arrival order; slower hedged requests still running at that point are left to finish in the background.
+def gather(section, query, need, emit):
+    waiting = ordered(section)
+    batches, errors = [], []
+    found = 0
+    pending = {}  # future -> provider
+    newest = None  # (provider, started) of the most recent launch; hedging is timed from it
+    last = None  # Provider that answered (or failed) most recently
+    escalated = False
+    hedging = fetch.budget.get() is None
+    pool = ThreadPoolExecutor(max_workers=max(1, len(waiting)), thread_name_prefix=f"voyageai-{section}")
+
+    def launch():
+        nonlocal newest
+        while waiting:
+            provider = waiting.pop(0)
+            if stats_for(section, provider.name).allow():
+                future = pool.submit(contextvars.copy_context().run, _call, provider, query, need)
+                pending[future] = provider
+                newest = (provider, time.monotonic())
+                return provider
+            metrics.count("provider_skips_total", section=section, provider=provider.name)
+            emit(provider.name, "skip", f"{provider.label} skipped: circuit open after repeated failures")
+        return None
+
+    def escalate(provider, kind, reason):
+        nonlocal escalated
+        if not escalated:
+            escalated = True
+            metrics.count("section_fallbacks_total", section=section)  # Lookups that needed more than one provider
+        metrics.count("fallbacks_total", section=section, provider=provider.name)
+        emit(provider.name, kind, reason)
+
+    try:
+        launch()
+        while pending:
+            timeout = None
+            if waiting and hedging:
+                slow, started = newest
+                timeout = max(0.0, started + stats_for(section, slow.name).latency(0.9) - time.monotonic())
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:  # Past its p90: hedge with the next provider, keep waiting on both
+                nxt = launch()
+                if nxt:
+                    escalate(slow, "hedge", f"{slow.label} is slower than usual, also asking {nxt.label}")
+                continue
+            for future in done:
+                last = pending.pop(future)
+                try:
+                    items = future.result()
+                except Exception as e:
+                    errors.append((last, e))
+                    emit(last.name, "error", str(e))
+                    continue
+                batches.append((last.name, items))
+                found += len(items)
+                emit(last.name, "result", items[:])
+            if found >= need:
+                break
+            if not pending:
+                nxt = launch()
+                if nxt:
+                    escalate(last, "fallback", f"{last.label} found {found} so far, checking {nxt.label}")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    for provider in providers(section):
+        if found >= need:
+            break
+        if not provider.local:
+            continue
+        if last:
+            escalate(last, "fallback", f"{last.label} found {found} so far, using the {provider.label.lower()}")
+        try:
+            items = provider.search(query)
+        except Exception as e:
+            errors.append((provider, e))
+            emit(provider.name, "error", str(e))
+            continue
+        batches.append((provider.name, items))
+        found += len(items)
+        if items:
+            emit(provider.name, "result", items[:])
+    return batches, errors
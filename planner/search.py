@@ -0,0 +1,87 @@
+import datetime
+import logging
+from urllib.parse import quote
+
+from . import metrics
+from .cache import result_cache
+from .itinerary import build_itinerary
+from .prices import sort_key
+from .providers import Query, google_url
+from .scheduler import gather
+from .singleflight import coalesced
+
+# Section lookups: each asks planner.scheduler for results from the registered providers
+# (planner.providers: Rome2Rio / Booking.com / Google, then the curated catalog) and shapes them for the app
+
+log = logging.getLogger(__name__)
+
+NEED = {"transport": 2, "hotels": 2, "attractions": 3}  # Results that make a section good enough to stop asking
+
+
+# Default for the `emit` hook below
+def _ignore(provider, kind, data):
+    pass
+
+
+# Each helper takes an optional `emit(provider, kind, data)` hook that is called as each provider answers:
+# kind "result" (data = that provider's options), "fallback" / "hedge" / "skip" (data = why another provider
+# is tried or one is left out) or "error". planner.core.plan_events turns these into a stream for progressive rendering.
+# Lookups are cached (planner.cache), then coalesced across sessions (planner.singleflight).
+
+# Helper for transport with enhanced fallback and clearer formatting
+@result_cache.cached("transport", key_args=4, cacheable=lambda options: options[0]['price'] != "")  # Don't cache errors/empty results
+@coalesced("transport", key_args=4)
+def search_transport(start, dest, date_start, date_end, emit=None):
+    emit = emit or _ignore
+    metrics.count("section_lookups_total", section="transport")
+    batches, errors = gather("transport", Query(start, dest, date_start, date_end), NEED["transport"], emit)
+    options = [opt for _, items in batches for opt in items]
+    if not options and errors:
+        return [{"mode": "Error: " + str(errors[0][1]), "price": "", "link": ""}]
+    with metrics.span("sort", None, "transport"):
+        options.sort(key=sort_key)  # Cheapest first, in the base currency
+    return options[:3] or [{"mode": "No specific options found", "price": "", "link": google_url(f"cheap flights or transport from {start} to {dest} on {date_start} prices")}]
+
+# Helper for hotels with improved fallback and encoding fix
+# Pass a list as `warnings` to collect scrape warnings for the caller to show; otherwise they're logged
+@result_cache.cached("hotels", key_args=3, cacheable=lambda hotels: hotels[0]['name'] != "No specific hotels found")
+@coalesced("hotels", key_args=3)
+def search_hotels(dest, date_start, date_end, warnings=None, emit=None):
+    warn = warnings.append if warnings is not None else log.warning
+    emit = emit or _ignore
+    metrics.count("section_lookups_total", section="hotels")
+    batches, errors = gather("hotels", Query("", dest, date_start, date_end), NEED["hotels"], emit)
+    for provider, e in errors:
+        warn(f"{provider.label} scrape failed: {str(e)}. Trying the other sources.")
+    hotels = [hotel for _, items in batches for hotel in items]
+
+    if not hotels:
+        return [{"name": "No specific hotels found", "price": "N/A", "rating": "N/A", "link": "https://www.google.com/search?q=hotels+in+" + quote(dest)}]
+
+    # Sort by nightly price in the base currency
+    with metrics.span("sort", None, "hotels"):
+        hotels.sort(key=sort_key)
+    return hotels[:3]
+
+# Helper for attractions and itinerary with dynamic web search fallback
+@result_cache.cached("attractions", key_args=3, cacheable=lambda result: not result[1].startswith("Error"), restore=tuple)
+@coalesced("attractions", key_args=3, restore=tuple)
+def get_attractions(dest, date_start, date_end, emit=None):
+    emit = emit or _ignore
+    metrics.count("section_lookups_total", section="attractions")
+    try:
+        batches, errors = gather("attractions", Query("", dest, date_start, date_end), NEED["attractions"], emit)
+        # One source's list reads better than a mix: take the first that found enough, else the catalog's
+        full = [items for _, items in batches if len(items) >= NEED["attractions"]]
+        attractions = full[0] if full else next((items for name, items in batches if name == "catalog" and items), None)
+        if not attractions:
+            attractions = ["Local highlights—search for more details! Try [TripAdvisor](https://www.tripadvisor.com/Attractions) for more."]  # General with link
+        
+        # Generate itinerary based on attractions
+        start_dt = datetime.datetime.strptime(date_start, '%Y-%m-%d')
+        end_dt = datetime.datetime.strptime(date_end, '%Y-%m-%d')
+        days = (end_dt - start_dt).days + 1
+        return attractions, build_itinerary(attractions, days), days
+    except Exception as e:
+        emit("google", "error", str(e))
+        return [str(e)], "Error generating itinerary. Try manually!", 1
@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from functools import wraps
+
+from . import fetch, metrics
+from .cache import make_key
+
+# Request coalescing: while a lookup is in flight, identical lookups from other sessions/threads wait
+# for it and get the same result instead of scraping again. With VOYAGEAI_WORKER_URL set, the lookup
+# itself runs in a shared worker process (python -m planner.worker), so several Streamlit replicas
+# coalesce there too. If the worker can't be reached (or drops a lookup halfway), lookups run locally
+# for WORKER_COOLDOWN seconds before the worker is tried again. Lookups on a request budget (prefetching)
+# always run locally, where the budget applies, and never share a flight with interactive ones.
+
+WORKER_URL = os.environ.get("VOYAGEAI_WORKER_URL", "").rstrip("/") or None
+WORKER_TIMEOUT = (0.5, 90)  # The worker is local, so connecting is quick; a lookup may walk a whole provider chain
+WORKER_COOLDOWN = 30.0
+
+log = logging.getLogger(__name__)
+_session = None
+_session_lock = threading.Lock()
+_worker_down_until = 0.0
+
+
+class WorkerError(Exception):
+    pass
+
+
+class SingleFlight:
+    def __init__(self):
+        self.enabled = True  # Off: every call runs on its own (the benchmarks measure the scrape path)
+        self._calls = {}  # key -> Future of the call in flight
+        self._lock = threading.Lock()
+
+    # Run fn unless an identical call is already running; then wait for that one's result (or exception)
+    def do(self, key, fn, *args, **kwargs):
+        if not self.enabled:
+            return fn(*args, **kwargs)
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        metrics.count("coalesced_total", provider=key.split(":", 1)[0], role="leader" if leader else "follower")
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+flights = SingleFlight()
+
+
+# Own session for the worker: no retries, so an outage costs one refused connection rather than
+# the scrape session's backoff
+def _worker_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            session.mount("http://", HTTPAdapter(pool_maxsize=16, max_retries=0))
+            session.mount("https://", HTTPAdapter(pool_maxsize=16, max_retries=0))
+            _session = session
+        return _session
+
+
+# Ask the worker for a lookup. It streams JSON lines: {"event": [provider, kind, data]} as providers
+# answer, then {"result": ..., "warnings": [...]} or {"error": ...}.
+def _remote(provider, args, emit, restore):
+    response = _worker_session().post(f"{WORKER_URL}/{provider}", json={"args": list(args)}, stream=True, timeout=WORKER_TIMEOUT)
+    response.raise_for_status()
+    for line in response.iter_lines():
+        if not line:
+            continue
+        message = json.loads(line)
+        if "event" in message:
+            if emit:
+                emit(*message["event"])
+        elif "error" in message:
+            raise WorkerError(message["error"])
+        else:
+            return (restore(message["result"]) if restore else message["result"]), message.get("warnings", [])
+    raise ConnectionError("worker closed the stream without a result")  # Died or restarted mid-lookup
+
+
+# Decorator for the search helpers: coalesce on the first `key_args` positional arguments (the same key
+# as the result cache). Only the caller that started a lookup gets its `emit` events and warnings;
+# callers that joined it receive just the result. List arguments collect the worker's warnings.
+def coalesced(provider, key_args, restore=None):
+    def decorate(fn):
+        def run(*args, **kwargs):
+            global _worker_down_until
+            if WORKER_URL and fetch.budget.get() is None and time.monotonic() >= _worker_down_until:
+                try:
+                    result, warnings = _remote(provider, args[:key_args], kwargs.get("emit"), restore)
+                except (OSError, ValueError) as e:  # requests' errors are OSErrors; a worker-reported error is not
+                    _worker_down_until = time.monotonic() + WORKER_COOLDOWN
+                    log.warning("Worker at %s unavailable (%s); running lookups locally for %ds", WORKER_URL, e, WORKER_COOLDOWN)
+                else:
+                    for extra in list(args[key_args:]) + [v for k, v in kwargs.items() if k != "emit"]:
+                        if isinstance(extra, list):
+                            extra.extend(warnings)
+                    return result
+            return fn(*args, **kwargs)
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = make_key(provider, args[:key_args])
+            if fetch.budget.get() is not None:
+                key += ":budgeted"  # Runs unhedged; an interactive caller must not end up waiting on it
+            return flights.do(key, run, *args, **kwargs)
+        return wrapper
+    return decorate
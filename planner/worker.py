@@ -0,0 +1,104 @@
+import argparse
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import metrics, singleflight
+from .search import get_attractions, search_hotels, search_transport
+
+# Local worker service: one process does the scraping for several Streamlit replicas, so identical
+# lookups from all of them share one fetch (and one result cache, and one set of rate limiters).
+#   python -m planner.worker --port 8765
+#   VOYAGEAI_WORKER_URL=http://127.0.0.1:8765 streamlit run VoyageAI.py   # in each replica
+# POST /<section> with {"args": [...]} streams JSON lines (see planner.singleflight._remote).
+# GET /health answers {"ok": true}; /metrics and /metrics.json are served like planner.metrics.start_server.
+
+HELPERS = {
+    "transport": search_transport,
+    "hotels": search_hotels,
+    "attractions": get_attractions,
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    def _send(self, body, kind):
+        self.send_response(200)
+        self.send_header("Content-Type", kind)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(b'{"ok": true}', "application/json")
+        elif self.path == "/metrics":
+            self._send(metrics.render_prometheus().encode(), "text/plain; version=0.0.4")
+        elif self.path == "/metrics.json":
+            self._send(json.dumps(metrics.snapshot()).encode(), "application/json")
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        helper = HELPERS.get(self.path.strip("/"))
+        if helper is None:
+            self.send_error(404)
+            return
+        try:
+            args = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))["args"]
+        except (ValueError, KeyError):
+            self.send_error(400)
+            return
+        # Stream events as they happen; the body ends when the connection closes
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        lock = threading.Lock()
+
+        def write(message):
+            with lock:
+                self.wfile.write((json.dumps(message, ensure_ascii=False) + "\n").encode())
+                self.wfile.flush()
+
+        def emit(provider, kind, data):
+            try:
+                write({"event": [provider, kind, data]})
+            except OSError:
+                pass  # Client went away; the lookup still finishes and fills the cache
+
+        try:
+            warnings = []
+            if helper is search_hotels:
+                result = helper(*args, warnings, emit=emit)
+            else:
+                result = helper(*args, emit=emit)
+            write({"result": result, "warnings": warnings})
+        except OSError:
+            pass
+        except Exception as e:
+            write({"error": str(e)})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port, host="127.0.0.1"):
+    singleflight.WORKER_URL = None  # This process is the worker; never forward to itself
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the shared scraping worker for Streamlit replicas")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = serve(args.port, args.host)
+    print(f"VoyageAI worker on http://{args.host}:{args.port}", file=sys.stderr)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
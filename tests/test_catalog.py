@@ -0,0 +1,11 @@
+from planner.catalog import Catalog
+
+
+# City names are matched on word boundaries: a trailing country is fine, a longer word is another place
+def test_resolve_matches_leading_words_only(tmp_path):
+    catalog = Catalog(path=str(tmp_path / "catalog.sqlite3"))
+    assert catalog.city("Rome, Italy")["key"] == "roma"
+    assert catalog.city("Kuala Lumpur, Malaysia")["key"] == "kualalumpur"
+    for name in ("Romania", "Romeoville", "Romford"):
+        assert catalog.city(name) is None
+        assert catalog.transports(name) == []